@@ -2,10 +2,35 @@ import os
 import sys
 import time
 import asyncio
+import bisect
+import codecs
+import contextlib
+import contextvars
+import copy
+import cProfile
 import csv
+import datetime
+import functools
+import hashlib
+import heapq
+import inspect
+import io
+import itertools
 import json
 import logging
-from collections import deque
+import math
+import multiprocessing
+import pstats
+import random
+import shutil
+import signal
+import tempfile
+import threading
+import tracemalloc
+import weakref
+import zipfile
+from array import array
+from collections import Counter, OrderedDict, deque
 from typing import Optional, AsyncGenerator, Deque
 from pathlib import Path
 
@@ -23,9 +48,21 @@ except ImportError:
     from server.__version__ import __version__
 
 try:
-    from pdfminer.high_level import extract_text as pdf_extract_text
+    import resource  # POSIX only; used for worker memory limits
+except ImportError:  # pragma: no cover
+    resource = None
+
+try:
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
 except Exception:  # pragma: no cover
-    pdf_extract_text = None
+    TextConverter = None
+    LAParams = None
+    PDFPageInterpreter = None
+    PDFResourceManager = None
+    PDFPage = None
 
 try:
     from openpyxl import load_workbook
@@ -107,45 +144,714 @@ try:
 except ValueError:
     _default_max_pages = 50
 
+# Maximum file size in MB for formats parsed as a whole document (0 means unlimited)
+_max_file_size_mb_env = os.getenv("DOC_READER_MAX_FILE_SIZE_MB", "100")
+try:
+    _max_file_size_mb = max(0, int(_max_file_size_mb_env))
+except ValueError:
+    _max_file_size_mb = 100
+
+# Maximum file size in MB for text formats streamed in bounded memory (0 means unlimited)
+_max_stream_file_size_mb_env = os.getenv("DOC_READER_MAX_STREAM_FILE_SIZE_MB", "0")
+try:
+    _max_stream_file_size_mb = max(0, int(_max_stream_file_size_mb_env))
+except ValueError:
+    _max_stream_file_size_mb = 0
+
+# Formats extract_text_from_file_stream reads incrementally through buffered reads
+_STREAMABLE_EXTENSIONS = (".csv", ".txt", ".log", ".text", ".md", ".markdown")
+
 
 def _enforce_rate_limit() -> None:
     if not _rate_limiter.allow():
         raise RuntimeError("Rate limit exceeded. Try again later or increase limits in configuration.")
 
 
+def _max_file_size_mb_for(ext_lower: str, streaming: bool = False) -> int:
+    """
+    Return the size limit in MB for a file extension (0 means unlimited).
+
+    DOC_READER_MAX_FILE_SIZE_MB_<EXT> (e.g. DOC_READER_MAX_FILE_SIZE_MB_CSV) overrides
+    the defaults for one format. Otherwise streamable text formats read by the stream
+    tool, and CSV files read with mode="profile" or mode="sample", use
+    DOC_READER_MAX_STREAM_FILE_SIZE_MB and everything else uses DOC_READER_MAX_FILE_SIZE_MB.
+    """
+    override_env = os.getenv(f"DOC_READER_MAX_FILE_SIZE_MB_{ext_lower.lstrip('.').upper()}")
+    if override_env:
+        try:
+            return max(0, int(override_env))
+        except ValueError:
+            pass
+    if streaming and ext_lower in _STREAMABLE_EXTENSIONS:
+        return _max_stream_file_size_mb
+    return _max_file_size_mb
+
+
+def _enforce_file_size_limit(path: str, streaming: bool = False) -> None:
+    _, ext = os.path.splitext(path)
+    ext_lower = ext.lower()
+    limit_mb = _max_file_size_mb_for(ext_lower, streaming=streaming)
+    if limit_mb > 0 and _document_size(path) > limit_mb * 1024 * 1024:
+        raise ValueError(
+            f"File too large; limit for {ext_lower or 'this'} files is {limit_mb}MB. "
+            f"Set DOC_READER_MAX_FILE_SIZE_MB_{ext_lower.lstrip('.').upper()} to adjust."
+        )
+
+
+class TextBuilder:
+    """
+    Assemble extractor output from lines or page texts without intermediate copies.
+
+    Pieces are kept in a list with their end offsets in an array, so the text is built
+    with a single join and truncation and stream chunking are decided from offsets.
+    Once the output passes max_chars, further pieces are refused and only counted.
+    Page and sheet markers and row ends let a truncation notice say where output stops.
+    """
+
+    def __init__(self, separator: str = "\n", max_chars: Optional[int] = None) -> None:
+        self.separator = separator
+        self.max_chars = _max_output_chars if max_chars is None else max_chars
+        self.total_length = 0
+        self.exact_size = True
+        self.row_count = 0
+        self._piece_count = 0
+        self._pieces: list[str] = []
+        self._ends = array("q")
+        self._first_start = 0
+        self._row_ends = array("q")
+        self._markers: list[tuple[int, str]] = []
+
+    @property
+    def truncated(self) -> bool:
+        return 0 < self.max_chars < self.total_length
+
+    def append(self, piece: str) -> bool:
+        """Add a line or page; returns False once the limit is passed and the piece was dropped."""
+        full = self.truncated
+        if self._piece_count:
+            self.total_length += len(self.separator)
+        self._piece_count += 1
+        self.total_length += len(piece)
+        if full:
+            self.exact_size = False
+            return False
+        self._pieces.append(piece)
+        self._ends.append(self.total_length)
+        return True
+
+    def append_row(self, line: str) -> bool:
+        kept = self.append(line)
+        if kept:
+            self.row_count += 1
+            self._row_ends.append(self.total_length)
+        return kept
+
+    def mark(self, label: str) -> None:
+        """Record that the next piece starts a new page or sheet."""
+        start = self.total_length + (len(self.separator) if self._piece_count else 0)
+        self._markers.append((start, label))
+
+    def _piece_start(self, index: int) -> int:
+        return self._ends[index] - len(self._pieces[index])
+
+    def _line_break_before(self, limit: int) -> int:
+        """Offset of the last newline before limit, or -1 if none within the last 1000 characters."""
+        index = min(bisect.bisect_left(self._ends, limit), len(self._pieces) - 1)
+        while index >= 0:
+            start = self._piece_start(index)
+            position = self._pieces[index].rfind("\n", 0, max(0, limit - start))
+            if position >= 0:
+                return start + position
+            if start <= limit - 1000:
+                return -1
+            if index > 0 and "\n" in self.separator:
+                return start - len(self.separator) + self.separator.rfind("\n")
+            index -= 1
+        return -1
+
+    def _text_until(self, end: int) -> str:
+        count = bisect.bisect_right(self._ends, end)
+        text = self.separator.join(self._pieces[:count])
+        if count < len(self._pieces):
+            # Same as slicing the joined text: end may fall inside the separator or on the piece start
+            if count:
+                text += self.separator[: end - self._ends[count - 1]]
+            text += self._pieces[count][: max(0, end - self._piece_start(count))]
+        return text
+
+    def _location_at(self, end: int) -> str:
+        rows = bisect.bisect_right(self._row_ends, end)
+        marker = bisect.bisect_right(self._markers, (end, "\uffff")) - 1
+        label = self._markers[marker][1] if marker >= 0 else ""
+        if rows and label:
+            return f"Output ends after row {rows:,}, in {label}. "
+        if rows:
+            return f"Output ends after row {rows:,}. "
+        if label:
+            return f"Output ends in {label}. "
+        return ""
+
+    def build(self, truncated_rows: bool = False, file_path: str = "") -> str:
+        """Return the text, truncated at a line boundary with a notice if it passed max_chars."""
+        if not self.truncated:
+            return self.separator.join(self._pieces)
+
+        truncation_point = self.max_chars
+        # Try to truncate at a line boundary for cleaner output
+        last_newline = self._line_break_before(self.max_chars)
+        if last_newline > self.max_chars - 1000:
+            truncation_point = last_newline
+
+        original_size = f"{self.total_length:,}" if self.exact_size else f"at least {self.total_length:,}"
+        warning_msg = (
+            f"\n\n[TRUNCATED: Output exceeded {self.max_chars:,} character limit. "
+            f"Original size: {original_size} characters. "
+        )
+        if file_path:
+            warning_msg += f"File: {os.path.basename(file_path)}. "
+        warning_msg += self._location_at(truncation_point)
+        if truncated_rows:
+            warning_msg += "Consider using max_rows or max_pages parameter to limit input. "
+        warning_msg += (
+            f"To increase limit, set DOC_READER_MAX_OUTPUT_CHARS environment variable.]"
+        )
+        return self._text_until(truncation_point) + warning_msg
+
+    def drain_chunks(self, chunk_size: int, final: bool = False):
+        """
+        Remove and yield chunks of whole pieces of up to about chunk_size characters.
+
+        Pieces of a chunk are joined with the separator. Until final, only full chunks are
+        yielded; pieces past max_chars are never yielded, so streams end on a row boundary.
+        """
+        while self._pieces:
+            available = len(self._pieces)
+            if self.truncated:
+                # The piece that crossed the limit and anything after it is never streamed
+                available = bisect.bisect_right(self._ends, self.max_chars)
+                if available == 0:
+                    self._pieces.clear()
+                    self._ends = array("q")
+                    return
+            count = min(max(1, bisect.bisect_right(self._ends, self._first_start + chunk_size)), available)
+            if count == len(self._pieces) and not final:
+                return
+            chunk = self.separator.join(self._pieces[:count])
+            if count < len(self._pieces):
+                self._first_start = self._piece_start(count)
+            else:
+                self._first_start = self.total_length + len(self.separator)
+            del self._pieces[:count]
+            del self._ends[:count]
+            yield chunk
+
+
 def _truncate_output_if_needed(text: str, truncated_rows: bool = False, file_path: str = "") -> str:
     """Truncate output text if it exceeds maximum character limit and add warning."""
     if len(text) <= _max_output_chars:
         return text
-    
-    truncation_point = _max_output_chars
-    # Try to truncate at a line boundary for cleaner output
-    last_newline = text.rfind("\n", 0, _max_output_chars)
-    if last_newline > _max_output_chars - 1000:  # Within reasonable distance
-        truncation_point = last_newline
-    
-    truncated_text = text[:truncation_point]
-    
-    warning_msg = (
-        f"\n\n[TRUNCATED: Output exceeded {_max_output_chars:,} character limit. "
-        f"Original size: {len(text):,} characters. "
+    builder = TextBuilder(separator="")
+    builder.append(text)
+    return builder.build(truncated_rows=truncated_rows, file_path=file_path)
+
+
+# Default per-call time budget in seconds (0 means no time limit)
+_default_timeout_seconds_env = os.getenv("DOC_READER_DEFAULT_TIMEOUT_SECONDS", "300")
+try:
+    _default_timeout_seconds = max(0.0, float(_default_timeout_seconds_env))
+except ValueError:
+    _default_timeout_seconds = 300.0
+
+# Start method for extraction worker processes; empty uses forkserver where available
+# (a single-threaded helper forked before the server starts threads), else the platform default
+_subprocess_start_method = os.getenv("DOC_READER_SUBPROCESS_START_METHOD", "") or None
+if _subprocess_start_method is None and "forkserver" in multiprocessing.get_all_start_methods():
+    _subprocess_start_method = "forkserver"
+_subprocess_context = multiprocessing.get_context(_subprocess_start_method)
+# Workers replaced while the server runs are never forked from the (by then threaded) server
+if _subprocess_context.get_start_method() == "fork":
+    _replacement_context = multiprocessing.get_context(
+        "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
     )
-    
-    if file_path:
-        warning_msg += f"File: {os.path.basename(file_path)}. "
-    
-    if truncated_rows:
-        warning_msg += "Consider using max_rows or max_pages parameter to limit input. "
-    
-    warning_msg += (
-        f"To increase limit, set DOC_READER_MAX_OUTPUT_CHARS environment variable.]"
+else:
+    _replacement_context = _subprocess_context
+if _replacement_context.get_start_method() == "forkserver":
+    # Workers forked by the helper start with the format libraries already imported
+    _replacement_context.set_forkserver_preload([__name__])
+
+# Number of pre-forked extraction worker processes
+_worker_count_env = os.getenv("DOC_READER_WORKER_COUNT", str(os.cpu_count() or 1))
+try:
+    _worker_count = max(1, int(_worker_count_env))
+except ValueError:
+    _worker_count = os.cpu_count() or 1
+
+# Jobs a worker runs before it is replaced with a fresh process
+_worker_max_jobs_env = os.getenv("DOC_READER_WORKER_MAX_JOBS", "100")
+try:
+    _worker_max_jobs = max(1, int(_worker_max_jobs_env))
+except ValueError:
+    _worker_max_jobs = 100
+
+# Hard address-space limit per worker in MB (0 means no limit; POSIX only)
+_worker_memory_limit_mb_env = os.getenv("DOC_READER_WORKER_MEMORY_LIMIT_MB", "4096")
+try:
+    _worker_memory_limit_mb = max(0, int(_worker_memory_limit_mb_env))
+except ValueError:
+    _worker_memory_limit_mb = 4096
+
+# Peak RSS in MB after which a worker is recycled once its current job finishes (0 disables)
+_worker_max_rss_mb_env = os.getenv("DOC_READER_WORKER_MAX_RSS_MB", "1024")
+try:
+    _worker_max_rss_mb = max(0, int(_worker_max_rss_mb_env))
+except ValueError:
+    _worker_max_rss_mb = 1024
+
+# Set only inside a worker process; receives partial results as they are produced
+_partial_result_connection = None
+
+# MCP transport: "stdio" (default), "http" (streamable HTTP) or "sse"
+_transport = os.getenv("DOC_READER_TRANSPORT", "stdio").strip().lower()
+if _transport not in ("stdio", "http", "sse"):
+    _transport = "stdio"
+
+# Address for the http and sse transports; loopback by default
+_http_host = os.getenv("DOC_READER_HTTP_HOST", "127.0.0.1")
+_http_port_env = os.getenv("DOC_READER_HTTP_PORT", "8000")
+try:
+    _http_port = int(_http_port_env)
+except ValueError:
+    _http_port = 8000
+
+
+def _resolve_timeout(timeout_seconds: Optional[float]) -> float:
+    """Return the effective time budget for a call (0 means unlimited)."""
+    if timeout_seconds is None:
+        return _default_timeout_seconds
+    return max(0.0, float(timeout_seconds))
+
+
+def _timeout_notice(timeout_seconds: float, detail: str = "") -> str:
+    return (
+        f"\n\n[TIMEOUT: Stopped after {timeout_seconds:g} seconds{detail}. "
+        f"Use timeout_seconds parameter or DOC_READER_DEFAULT_TIMEOUT_SECONDS to adjust.]"
     )
-    
-    return truncated_text + warning_msg
+
+
+# Set by a job whose worker must be replaced once it returns (see _run_at_low_priority)
+_retire_worker_after_job = False
+
+
+def _report_partial_result(piece: str) -> None:
+    """Forward a finished piece of output (e.g. one PDF page) to the supervising process."""
+    if _partial_result_connection is not None:
+        _partial_result_connection.send(("partial", piece))
+
+
+def _run_at_low_priority(func, args: tuple, kwargs: dict):
+    """Run a pool job at the lowest CPU priority; the worker is replaced afterwards."""
+    global _retire_worker_after_job
+    # Niceness cannot be raised again without privileges, so the worker does not take more jobs
+    _retire_worker_after_job = True
+    if hasattr(os, "nice"):
+        try:
+            os.nice(19)
+        except OSError:
+            pass
+    return func(*args, **kwargs)
+
+
+def _apply_worker_memory_limit(memory_limit_mb: int) -> None:
+    if resource is None or memory_limit_mb <= 0:
+        return
+    limit_bytes = memory_limit_mb * 1024 * 1024
+    try:
+        _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+        if hard_limit != resource.RLIM_INFINITY:
+            limit_bytes = min(limit_bytes, hard_limit)
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, hard_limit))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not apply worker memory limit: {e}")
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def _worker_main(connection, memory_limit_mb: int, max_rss_mb: int) -> None:
+    """Job loop of a pool worker: receive (func, args, kwargs), send back the outcome."""
+    global _partial_result_connection
+    _partial_result_connection = connection
+    # Ctrl+C is handled by the server process, which tears the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _apply_worker_memory_limit(memory_limit_mb)
+
+    while True:
+        try:
+            func, args, kwargs = connection.recv()
+        except (EOFError, OSError):
+            return
+
+        try:
+            message = ("result", func(*args, **kwargs))
+        except MemoryError:
+            message = ("error", MemoryError(
+                f"Worker memory limit of {memory_limit_mb} MB exceeded while processing the file. "
+                f"Set DOC_READER_WORKER_MEMORY_LIMIT_MB to adjust."
+            ))
+        except BaseException as e:
+            message = ("error", e)
+
+        retire = _retire_worker_after_job or isinstance(message[1], MemoryError) or (max_rss_mb > 0 and _peak_rss_mb() > max_rss_mb)
+        try:
+            connection.send((message[0], message[1], retire))
+        except Exception as e:
+            connection.send(("error", RuntimeError(f"Failed to return worker result: {e}"), True))
+            return
+        if retire:
+            return
+
+
+class _ExtractionWorker:
+    """Handle for one worker process and the pipe used to talk to it."""
+
+    def __init__(self, process, connection) -> None:
+        self.process = process
+        self.connection = connection
+        self.jobs_completed = 0
+
+    def close(self) -> None:
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+
+
+class ExtractionWorkerPool:
+    """Pool of pre-forked worker processes that run parsers outside the server process.
+
+    Workers import the format libraries once and are reused across calls. Each
+    worker runs under an address-space limit and is replaced after a number of
+    jobs, when its peak RSS passes a threshold, or when a job times out, is
+    cancelled or kills it, so a memory blow-up costs one worker, not the server.
+    """
+
+    def __init__(self, size: int, max_jobs_per_worker: int, memory_limit_mb: int, max_rss_mb: int) -> None:
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.memory_limit_mb = memory_limit_mb
+        self.max_rss_mb = max_rss_mb
+        self._idle_workers: list[_ExtractionWorker] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._started = False
+
+    def start(self) -> None:
+        """Pre-fork all workers (call before the server starts other threads where possible)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for _ in range(self.size):
+                self._idle_workers.append(self._spawn_worker(_subprocess_context))
+            if _replacement_context is not _subprocess_context and _replacement_context.get_start_method() == "forkserver":
+                # Start the fork helper now, while the server process has no other threads
+                import multiprocessing.forkserver
+                multiprocessing.forkserver.ensure_running()
+
+    def _spawn_worker(self, context=None) -> _ExtractionWorker:
+        context = context or _replacement_context
+        parent_connection, child_connection = context.Pipe()
+        process = context.Process(
+            target=_worker_main,
+            args=(child_connection, self.memory_limit_mb, self.max_rss_mb),
+            name="doc-reader-worker",
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        return _ExtractionWorker(process, parent_connection)
+
+    def _checkout(self) -> Optional[_ExtractionWorker]:
+        with self._lock:
+            return self._idle_workers.pop() if self._idle_workers else None
+
+    def _replace_worker(self, worker: Optional[_ExtractionWorker], release_slot: bool) -> None:
+        """Kill and join worker, then add a fresh one to the idle list (blocking; runs off the event loop)."""
+        try:
+            if worker is not None:
+                worker.close()
+            replacement = self._spawn_worker()
+            with self._lock:
+                self._idle_workers.append(replacement)
+        except Exception as e:
+            logger.warning(f"Failed to replace extraction worker: {e}")
+        finally:
+            if release_slot:
+                self._slots.release()
+
+    async def run(self, func, args: tuple, kwargs: dict, timeout_seconds: float) -> tuple:
+        """
+        Run func(*args, **kwargs) on a pool worker.
+
+        The worker is killed and replaced when the time budget runs out or when the
+        awaiting task is cancelled (e.g. the MCP request was cancelled), so a runaway
+        parser never keeps a CPU busy after the caller has given up.
+
+        Returns:
+            Tuple of (result, partial_pieces, timed_out). On timeout, result is None and
+            partial_pieces holds whatever the job reported via _report_partial_result.
+        """
+        loop = asyncio.get_running_loop()
+        if not self._started:
+            await loop.run_in_executor(None, self.start)
+        deadline = loop.time() + timeout_seconds if timeout_seconds > 0 else None
+
+        profile_session = _active_profile.get()
+        if profile_session is not None:
+            job_prof_path = profile_session.next_job_path()
+            func, args, kwargs = _run_profiled, (func, args, kwargs, job_prof_path, _profile_top_n), {}
+
+        # Wait for a free worker; the wait counts against the time budget
+        while not self._slots.acquire(blocking=False):
+            if deadline is not None and loop.time() >= deadline:
+                return None, [], True
+            await asyncio.sleep(0.02)
+
+        worker: Optional[_ExtractionWorker] = None
+        reusable = False
+        partial_pieces: list[str] = []
+        try:
+            worker = self._checkout()
+            while worker is None or not worker.process.is_alive():
+                # An idle worker died, or none is left: replace it off the event loop and wait
+                loop.run_in_executor(None, self._replace_worker, worker, False)
+                worker = None
+                while worker is None:
+                    if deadline is not None and loop.time() >= deadline:
+                        return None, [], True
+                    await asyncio.sleep(0.02)
+                    worker = self._checkout()
+            worker.connection.send((func, args, kwargs))
+            while True:
+                while worker.connection.poll():
+                    try:
+                        message = worker.connection.recv()
+                    except (EOFError, ConnectionResetError):
+                        worker.process.join(timeout=1)
+                        raise RuntimeError(
+                            f"Extraction worker exited unexpectedly (exit code {worker.process.exitcode}). "
+                            f"The file may exceed the worker memory limit (DOC_READER_WORKER_MEMORY_LIMIT_MB)."
+                        )
+                    if message[0] == "partial":
+                        partial_pieces.append(message[1])
+                        continue
+                    kind, payload, retire = message
+                    worker.jobs_completed += 1
+                    reusable = not retire
+                    if kind == "result":
+                        if profile_session is not None:
+                            payload, allocation_summary = payload
+                            profile_session.add_job(allocation_summary)
+                        return payload, partial_pieces, False
+                    raise payload
+                if deadline is not None and loop.time() >= deadline:
+                    return None, partial_pieces, True
+                await asyncio.sleep(0.02)
+        finally:
+            if worker is not None and reusable and worker.jobs_completed < self.max_jobs_per_worker:
+                with self._lock:
+                    self._idle_workers.append(worker)
+                self._slots.release()
+            elif worker is not None:
+                # Killing, joining and respawning block, so they run in the default executor;
+                # the slot is freed once the replacement is idle
+                loop.run_in_executor(None, self._replace_worker, worker, True)
+            else:
+                self._slots.release()
+
+
+_worker_pool = ExtractionWorkerPool(
+    size=_worker_count,
+    max_jobs_per_worker=_worker_max_jobs,
+    memory_limit_mb=_worker_memory_limit_mb,
+    max_rss_mb=_worker_max_rss_mb,
+)
+
+
+# Documents inside ZIP archives are addressed as "bundle.zip!/dir/report.pdf"
+_ARCHIVE_MEMBER_SEPARATOR = "!/"
+
+# Number of archives per process whose parsed central directory is kept open
+_archive_cache_size_env = os.getenv("DOC_READER_ARCHIVE_CACHE_SIZE", "16")
+try:
+    _archive_cache_size = max(0, int(_archive_cache_size_env))
+except ValueError:
+    _archive_cache_size = 16
+
+# Archive members that parsers need to seek in are buffered in memory up to this size,
+# then spill to an anonymous temporary file
+_archive_spool_max_mb_env = os.getenv("DOC_READER_ARCHIVE_SPOOL_MAX_MB", "64")
+try:
+    _archive_spool_max_mb = max(0, int(_archive_spool_max_mb_env))
+except ValueError:
+    _archive_spool_max_mb = 64
+
+
+class ArchiveDirectoryCache:
+    """
+    LRU cache of open zipfile.ZipFile objects keyed by archive path.
+
+    Opening a ZipFile parses the archive's central directory; keeping it open lets
+    repeated listings and member reads from the same bundle skip that work. Entries
+    are replaced when the archive's modification time or size changes.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[int, int, zipfile.ZipFile]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, archive_path: str) -> zipfile.ZipFile:
+        real_path = os.path.realpath(archive_path)
+        stat_result = os.stat(real_path)
+        with self._lock:
+            entry = self._entries.pop(real_path, None)
+            if entry is not None:
+                if entry[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+                    self._entries[real_path] = entry
+                    return entry[2]
+                entry[2].close()
+
+        try:
+            archive = zipfile.ZipFile(real_path)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Invalid ZIP archive {archive_path}: {e}") from e
+
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[real_path] = (stat_result.st_mtime_ns, stat_result.st_size, archive)
+                while len(self._entries) > self.max_entries:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    evicted.close()
+        return archive
+
+    def reset_after_fork(self) -> None:
+        # A forked worker must not share open file offsets with the server process
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+_archive_cache = ArchiveDirectoryCache(max_entries=_archive_cache_size)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_archive_cache.reset_after_fork)
+
+
+def _split_archive_path(path: str) -> Optional[tuple[str, str]]:
+    """
+    Split "bundle.zip!/dir/report.pdf" into ("bundle.zip", "dir/report.pdf").
+
+    Returns None for plain file paths.
+    """
+    marker = ".zip" + _ARCHIVE_MEMBER_SEPARATOR
+    index = path.lower().find(marker)
+    if index < 0:
+        return None
+    archive_path = path[: index + 4]
+    member_name = path[index + len(marker):]
+    if not member_name or not os.path.isfile(archive_path):
+        return None
+    return archive_path, member_name
+
+
+def _is_safe_member_name(member_name: str) -> bool:
+    """Return False for absolute member names and names with ".." components."""
+    normalized = member_name.replace("\\", "/")
+    return not normalized.startswith("/") and ".." not in normalized.split("/")
+
+
+def _get_archive_member_info(archive_path: str, member_name: str) -> zipfile.ZipInfo:
+    if not _is_safe_member_name(member_name):
+        raise ValueError(f"Refusing archive member with an absolute or '..' path: {member_name}")
+    try:
+        info = _archive_cache.open(archive_path).getinfo(member_name)
+    except KeyError:
+        raise FileNotFoundError(f"File not found in archive {archive_path}: {member_name}") from None
+    if info.is_dir():
+        raise ValueError(f"{member_name} is a directory; use list_archive to see its contents")
+    return info
+
+
+def _document_size(path: str) -> int:
+    """Return the size of a file, or the uncompressed size of an archive member."""
+    archive_member = _split_archive_path(path)
+    if archive_member is None:
+        return os.path.getsize(path)
+    return _get_archive_member_info(*archive_member).file_size
+
+
+def _document_identity(path: str) -> tuple[str, os.stat_result]:
+    """Return a canonical name for path and the stat of the file on disk that holds it."""
+    archive_member = _split_archive_path(path)
+    if archive_member is None:
+        return os.path.realpath(path), os.stat(path)
+    archive_path, member_name = archive_member
+    real_archive_path = os.path.realpath(archive_path)
+    return real_archive_path + _ARCHIVE_MEMBER_SEPARATOR + member_name, os.stat(real_archive_path)
+
+
+def _open_document(path: str, mode: str = "rb", encoding: Optional[str] = None, newline: Optional[str] = None):
+    """
+    Open a local file or an archive member ("bundle.zip!/report.pdf") for reading.
+
+    In text mode an archive member is decompressed as it is read. Binary mode serves
+    parsers that seek (pdfminer, openpyxl, python-docx), so the member is copied into a
+    spooled temporary buffer first.
+    """
+    archive_member = _split_archive_path(path)
+    if archive_member is None:
+        return open(path, mode, encoding=encoding, newline=newline)
+
+    archive_path, member_name = archive_member
+    info = _get_archive_member_info(archive_path, member_name)
+    member = _archive_cache.open(archive_path).open(info)
+    if "b" not in mode:
+        return io.TextIOWrapper(member, encoding=encoding, newline=newline)
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=_archive_spool_max_mb * 1024 * 1024)
+    with member:
+        shutil.copyfileobj(member, spooled, 1024 * 1024)
+    spooled.seek(0)
+    return spooled
+
+
+def _iter_pdf_page_texts(path: str, maxpages: int = 0, page_numbers=None):
+    """
+    Yield the text of each PDF page in order (same output as pdfminer's extract_text).
+
+    page_numbers optionally restricts the pages to a set of zero-based page indexes.
+    """
+    with _open_document(path) as fp, io.StringIO() as output_string:
+        resource_manager = PDFResourceManager(caching=True)
+        device = TextConverter(resource_manager, output_string, codec="utf-8", laparams=LAParams())
+        try:
+            interpreter = PDFPageInterpreter(resource_manager, device)
+            for page in PDFPage.get_pages(fp, pagenos=page_numbers, maxpages=maxpages, caching=True):
+                interpreter.process_page(page)
+                page_text = output_string.getvalue()
+                output_string.seek(0)
+                output_string.truncate(0)
+                yield page_text
+        finally:
+            device.close()
 
 
 def _extract_text_from_pdf(path: str, max_pages: Optional[int] = None) -> str:
-    if pdf_extract_text is None:
+    if PDFPage is None:
         raise RuntimeError(
             "pdfminer.six is not installed. To process PDF files, install it with: "
             "pip install pdfminer.six"
@@ -156,12 +862,20 @@ def _extract_text_from_pdf(path: str, max_pages: Optional[int] = None) -> str:
     
     # Use pdfminer's maxpages to avoid parsing the whole file when limited
     maxpages_arg = 0 if effective_max_pages <= 0 else int(effective_max_pages)
-    text = pdf_extract_text(path, maxpages=maxpages_arg)
+    builder = TextBuilder(separator="")
+    for page_number, page_text in enumerate(_iter_pdf_page_texts(path, maxpages=maxpages_arg), start=1):
+        builder.mark(f"page {page_number}")
+        # Stop laying out pages once the output limit has been passed
+        if not builder.append(page_text):
+            break
+        # Lets a supervising process return the pages finished so far on timeout
+        _report_partial_result(page_text)
+    text = builder.build(truncated_rows=True, file_path=path)
     
     if effective_max_pages > 0:
         text += f"\n\n[INFO: Page limit of {effective_max_pages} applied. Use max_pages parameter to adjust.]"
     
-    return _truncate_output_if_needed(text, truncated_rows=True, file_path=path)
+    return text
 
 
 def _extract_text_from_xlsx(path: str, max_rows: Optional[int] = None) -> str:
@@ -174,35 +888,109 @@ def _extract_text_from_xlsx(path: str, max_rows: Optional[int] = None) -> str:
     # Apply default row limit if none specified
     effective_max_rows = max_rows if max_rows is not None else _default_max_rows
     
-    workbook = load_workbook(filename=path, data_only=True, read_only=True)
-    try:
-        lines: list[str] = []
-        rows_emitted = 0
-        hit_row_limit = False
+    with _open_document(path) as source:
+        workbook = load_workbook(filename=source, data_only=True, read_only=True)
+        try:
+            builder = TextBuilder()
+            hit_row_limit = False
+            hit_char_limit = False
         
-        for sheet in workbook.worksheets:
-            lines.append(f"# Sheet: {sheet.title}")
-            for row in sheet.iter_rows(values_only=True):
-                values = ["" if cell is None else str(cell) for cell in row]
-                line = "\t".join(values).rstrip()
-                if line:
-                    lines.append(line)
-                    rows_emitted += 1
-                    if effective_max_rows > 0 and rows_emitted >= effective_max_rows:
-                        hit_row_limit = True
-                        break
-            if hit_row_limit:
-                break
-            lines.append("")
+            for sheet_index, sheet in enumerate(workbook.worksheets):
+                if sheet_index:
+                    builder.append("")
+                builder.mark(f"sheet '{sheet.title}'")
+                builder.append(f"# Sheet: {sheet.title}")
+                for row in sheet.iter_rows(values_only=True):
+                    values = ["" if cell is None else str(cell) for cell in row]
+                    line = "\t".join(values).rstrip()
+                    if line:
+                        if not builder.append_row(line):
+                            hit_char_limit = True
+                            break
+                        if effective_max_rows > 0 and builder.row_count >= effective_max_rows:
+                            hit_row_limit = True
+                            break
+                if hit_row_limit or hit_char_limit:
+                    break
         
-        result = "\n".join(lines).strip()
+            result = builder.build(truncated_rows=True, file_path=path)
         
-        if hit_row_limit:
-            result += f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]"
+            if hit_row_limit:
+                result += f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]"
         
-        return _truncate_output_if_needed(result, truncated_rows=True, file_path=path)
-    finally:
-        workbook.close()
+            return result
+        finally:
+            workbook.close()
+
+
+def _stream_xlsx_chunks(path: str, max_rows: Optional[int], chunk_size: int) -> list[str]:
+    """
+    Read workbook rows into chunks of about chunk_size characters for the stream tool.
+
+    Runs on a pool worker. Each full chunk is reported with _report_partial_result as
+    soon as it is ready, so a timeout still returns the rows read so far; the last
+    chunk and any limit notices are returned.
+    """
+    if load_workbook is None:
+        raise RuntimeError(
+            "openpyxl is not installed. To process Excel files, install it with: "
+            "pip install openpyxl"
+        )
+
+    # Apply default row limit if none specified
+    effective_max_rows = max_rows if max_rows is not None else _default_max_rows
+
+    with _open_document(path) as source:
+        workbook = load_workbook(filename=source, data_only=True, read_only=True)
+        try:
+            builder = TextBuilder()
+            hit_row_limit = False
+
+            for sheet in workbook.worksheets:
+                builder.mark(f"sheet '{sheet.title}'")
+                builder.append(f"# Sheet: {sheet.title}")
+
+                for row in sheet.iter_rows(values_only=True):
+                    values = ["" if cell is None else str(cell) for cell in row]
+                    line = "\t".join(values).rstrip()
+                    if not line:
+                        continue
+                    if not builder.append_row(line):
+                        break
+                    for chunk_text in builder.drain_chunks(chunk_size):
+                        _report_partial_result(chunk_text)
+                    if effective_max_rows > 0 and builder.row_count >= effective_max_rows:
+                        hit_row_limit = True
+                        break
+                if hit_row_limit or builder.truncated:
+                    break
+
+            chunks = list(builder.drain_chunks(chunk_size, final=True))
+            # Send info message if limits were hit
+            if hit_row_limit:
+                chunks.append(f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]")
+            if builder.truncated:
+                chunks.append(f"\n\n[TRUNCATED: Output exceeded {_max_output_chars:,} character limit.]")
+            return chunks
+        finally:
+            workbook.close()
+
+
+def _append_csv_rows(builder: TextBuilder, rows, max_rows: int) -> bool:
+    """Append non-empty CSV rows as tab-separated lines; returns True if max_rows was reached."""
+    for row in rows:
+        # csv.reader already yields strings, so cells are joined as-is
+        line = "\t".join(row).rstrip()
+        if line:
+            if not builder.append_row(line):
+                return False
+            if max_rows > 0 and builder.row_count >= max_rows:
+                return True
+    return False
+
+
+# Encodings tried, in order, when decoding plain-text and CSV files
+_TEXT_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
 
 
 def _extract_text_from_csv(path: str, max_rows: Optional[int] = None) -> str:
@@ -210,54 +998,37 @@ def _extract_text_from_csv(path: str, max_rows: Optional[int] = None) -> str:
     # Apply default row limit if none specified
     effective_max_rows = max_rows if max_rows is not None else _default_max_rows
     
-    lines: list[str] = []
-    rows_read = 0
-    hit_row_limit = False
-    
     # Try different encodings to handle various CSV files
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+    encodings = _TEXT_ENCODINGS
     
     for encoding in encodings:
         try:
-            with open(path, 'r', encoding=encoding, newline='') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    line = "\t".join(str(cell) for cell in row).rstrip()
-                    if line:
-                        lines.append(line)
-                        rows_read += 1
-                        if effective_max_rows > 0 and rows_read >= effective_max_rows:
-                            hit_row_limit = True
-                            break
+            builder = TextBuilder()
+            with _open_document(path, 'r', encoding=encoding, newline='') as f:
+                hit_row_limit = _append_csv_rows(builder, csv.reader(f), effective_max_rows)
             
-            result = "\n".join(lines).strip()
+            result = builder.build(truncated_rows=True, file_path=path)
             
             if hit_row_limit:
                 result += f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]"
             
-            return _truncate_output_if_needed(result, truncated_rows=True, file_path=path)
+            return result
         except (UnicodeDecodeError, UnicodeError):
             continue
         except Exception as e:
             if encoding == encodings[-1]:  # Last encoding attempt
                 raise RuntimeError(f"Failed to read CSV file: {e}") from e
     
-    if not lines:
-        raise RuntimeError("Failed to decode CSV file with any supported encoding")
-    
-    result = "\n".join(lines).strip()
-    if hit_row_limit:
-        result += f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]"
-    return _truncate_output_if_needed(result, truncated_rows=True, file_path=path)
+    raise RuntimeError("Failed to decode CSV file with any supported encoding")
 
 
 def _extract_text_from_txt(path: str) -> str:
     """Extract text from plain text file."""
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+    encodings = _TEXT_ENCODINGS
     
     for encoding in encodings:
         try:
-            with open(path, 'r', encoding=encoding) as f:
+            with _open_document(path, 'r', encoding=encoding) as f:
                 text = f.read()
                 return _truncate_output_if_needed(text, truncated_rows=False, file_path=path)
         except (UnicodeDecodeError, UnicodeError):
@@ -269,13 +1040,215 @@ def _extract_text_from_txt(path: str) -> str:
     raise RuntimeError("Failed to decode text file with any supported encoding")
 
 
+_TAIL_READ_BLOCK_BYTES = 64 * 1024
+
+
+def _decode_text_bytes(data: bytes) -> str:
+    """Decode raw text bytes like the text extractors: same encodings, universal newlines."""
+    for encoding in _TEXT_ENCODINGS:
+        try:
+            text = data.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        # Unreachable while latin-1 (which maps every byte) is in the list
+        text = data.decode('latin-1')
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _read_text_tail(path: str, tail_lines: int) -> str:
+    """
+    Return the last tail_lines lines of a text file, reading backwards from EOF.
+
+    Only the blocks holding those lines are read (capped at about 4 bytes per output
+    character), so the cost does not depend on the file size.
+    """
+    max_bytes = _max_output_chars * 4
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        position = file_size
+        blocks: list[bytes] = []
+        newline_count = 0
+        bytes_read = 0
+        # One extra newline is needed to know the oldest requested line is complete
+        while position > 0 and newline_count <= tail_lines and bytes_read < max_bytes:
+            read_size = min(_TAIL_READ_BLOCK_BYTES, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            blocks.append(block)
+            newline_count += block.count(b"\n")
+            bytes_read += read_size
+
+    data = b"".join(reversed(blocks))
+    lines = data.split(b"\n")
+    if data.endswith(b"\n"):
+        lines.pop()
+    if position > 0 and lines:
+        # The first piece starts mid-line
+        lines.pop(0)
+    selected = lines[-tail_lines:] if tail_lines > 0 else []
+    # Lines of CRLF files end with "\r"; the one-shot reader drops it with the newline
+    text = _decode_text_bytes(b"\n".join(line.removesuffix(b"\r") for line in selected))
+
+    if len(text) > _max_output_chars:
+        cut = text.find("\n", len(text) - _max_output_chars)
+        text = text[cut + 1:] if cut >= 0 else text[-_max_output_chars:]
+        text = (
+            f"[TRUNCATED: Output exceeded {_max_output_chars:,} character limit; "
+            f"showing the most recent lines only.]\n\n" + text
+        )
+
+    return text + (
+        f"\n\n[INFO: Showing last {len(selected)} lines. Next since_offset: {file_size}]"
+    )
+
+
+def _read_text_since(path: str, since_offset: int) -> str:
+    """
+    Return the complete lines appended to a file after byte offset since_offset.
+
+    If the file shrank below since_offset (truncated or rotated), reading restarts
+    at byte 0. At most DOC_READER_MAX_OUTPUT_CHARS bytes are read per call, which
+    keeps the decoded text within the output limit. A last line that is still being
+    written is left for the next call, unless it alone exceeds that read size.
+    """
+    max_bytes = _max_output_chars
+    notice = ""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        if since_offset > file_size:
+            notice = (
+                "[INFO: File is smaller than since_offset; it was truncated or rotated. "
+                "Reading from the start.]\n\n"
+            )
+            since_offset = 0
+        f.seek(since_offset)
+        data = f.read(min(max_bytes, file_size - since_offset))
+
+    more_available = since_offset + len(data) < file_size
+    # Stop at a line boundary so multi-byte characters and lines are not split. A final
+    # "\r" may be the first half of "\r\n", so it does not end a line yet.
+    last_line_end = max(data.rfind(b"\n"), data.rfind(b"\r", 0, len(data) - 1))
+    if last_line_end >= 0:
+        data = data[:last_line_end + 1]
+    elif len(data) < max_bytes:
+        data = b""
+    next_offset = since_offset + len(data)
+
+    if not data:
+        if next_offset < file_size:
+            return notice + (
+                f"[INFO: No complete new line since offset {since_offset}; the last line is still being written. "
+                f"Next since_offset: {next_offset}]"
+            )
+        return notice + f"[INFO: No new data since offset {since_offset}. Next since_offset: {next_offset}]"
+
+    text = _decode_text_bytes(data)
+    info = f"\n\n[INFO: Read bytes {since_offset}-{next_offset} of {file_size}. Next since_offset: {next_offset}"
+    if more_available:
+        info += ". More data is available; call again with the new offset"
+    return notice + text + info + "]"
+
+
+_CSV_READ_BUFFER_BYTES = 1024 * 1024
+
+
+class _FileRangeReader(io.RawIOBase):
+    """Raw reader over bytes start to end of a file; data appended past end is not read."""
+
+    def __init__(self, path: str, start: int = 0, end: Optional[int] = None) -> None:
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = None if end is None else max(0, end - start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining is None:
+            return self._file.readinto(buffer)
+        with memoryview(buffer) as view:
+            count = self._file.readinto(view[:self._remaining])
+        self._remaining -= count
+        return count
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _open_csv_text(path: str, encoding: str, start: int = 0, end: Optional[int] = None):
+    """
+    Open bytes start to end (default: end of file) of a CSV file as text for csv.reader.
+
+    newline='' leaves line endings to the csv module, so LF, CRLF and CR-only rows and
+    line breaks inside quoted cells are handled, and rows of any length stay whole.
+    Reads are buffered, so memory use does not grow with the file size. start must
+    begin a row.
+    """
+    raw = _FileRangeReader(path, start, end)
+    return io.TextIOWrapper(io.BufferedReader(raw, _CSV_READ_BUFFER_BYTES), encoding=encoding, newline='')
+
+
+def _iter_text_chunks(path: str, encoding: str, chunk_size: int, start: int = 0, end: Optional[int] = None):
+    """
+    Yield decoded text of about chunk_size characters from bytes start to end of a file.
+
+    end defaults to the size of the file when it is opened. Reads are buffered, so
+    memory use does not grow with the file size, and a file truncated while it is
+    being read just ends the text early.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if end is not None:
+            size = min(size, end)
+        f.seek(start)
+        remaining = size - start
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _extract_text_from_log_position(
+    path: str,
+    tail_lines: Optional[int] = None,
+    since_offset: Optional[int] = None,
+) -> str:
+    """Serve tail_lines / since_offset reads for plain text files."""
+    _, ext = os.path.splitext(path)
+    if ext.lower() not in (".txt", ".log", ".text"):
+        raise ValueError("tail_lines and since_offset are only supported for .txt, .log and .text files")
+    if tail_lines is not None and since_offset is not None:
+        raise ValueError("Use either tail_lines or since_offset, not both")
+    if tail_lines is not None:
+        if tail_lines < 0:
+            raise ValueError("tail_lines must be zero or positive")
+        return _read_text_tail(path, int(tail_lines))
+    if since_offset < 0:
+        raise ValueError("since_offset must be zero or positive")
+    return _read_text_since(path, int(since_offset))
+
+
 def _extract_text_from_json(path: str) -> str:
     """Extract text from JSON file (pretty-printed)."""
     encodings = ['utf-8', 'latin-1', 'cp1252']
     
     for encoding in encodings:
         try:
-            with open(path, 'r', encoding=encoding) as f:
+            with _open_document(path, 'r', encoding=encoding) as f:
                 data = json.load(f)
                 text = json.dumps(data, indent=2, ensure_ascii=False)
                 return _truncate_output_if_needed(text, truncated_rows=False, file_path=path)
@@ -296,7 +1269,7 @@ def _extract_text_from_markdown(path: str) -> str:
     
     for encoding in encodings:
         try:
-            with open(path, 'r', encoding=encoding) as f:
+            with _open_document(path, 'r', encoding=encoding) as f:
                 md_content = f.read()
                 
             # If markdown library is available, optionally convert to HTML
@@ -320,15 +1293,403 @@ def _extract_text_from_docx(path: str) -> str:
         )
     
     try:
-        doc = docx.Document(path)
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-        text = "\n".join(paragraphs)
-        return _truncate_output_if_needed(text, truncated_rows=False, file_path=path)
+        with _open_document(path) as source:
+            doc = docx.Document(source)
+        builder = TextBuilder()
+        for para in doc.paragraphs:
+            if para.text.strip() and not builder.append(para.text):
+                break
+        return builder.build(truncated_rows=False, file_path=path)
     except Exception as e:
         raise RuntimeError(f"Failed to extract text from DOCX: {e}") from e
 
 
-def _extract_images_from_pdf(pdf_path: str, output_dir: str, images_dirname: str) -> tuple[int, str, dict]:
+_TABULAR_EXTENSIONS = (".csv", ".xlsx", ".xlsm", ".xltx", ".xltm")
+_EXTRACTION_MODES = ("text", "profile", "sample")
+_PROFILE_CHUNK_ROWS = 5000
+_DEFAULT_SAMPLE_SIZE = 100
+
+
+class _DistinctCounter:
+    """Distinct-value counter: exact up to a threshold, then a HyperLogLog estimate.
+
+    The HyperLogLog sketch uses 2**precision one-byte registers (4 KiB by default),
+    so memory stays fixed no matter how many rows are seen. Values are hashed with
+    the built-in (SipHash) hash, which is stable for the lifetime of one profile.
+    """
+
+    def __init__(self, exact_threshold: int = 1000, precision: int = 12) -> None:
+        self.exact_threshold = exact_threshold
+        self.precision = precision
+        self.register_count = 1 << precision
+        self.registers = bytearray(self.register_count)
+        self._exact_values: Optional[set] = set()
+
+    def add(self, value: str) -> None:
+        if self._exact_values is not None:
+            self._exact_values.add(value)
+            if len(self._exact_values) <= self.exact_threshold:
+                return
+            exact_values = self._exact_values
+            self._exact_values = None
+            for exact_value in exact_values:
+                self._add_to_sketch(exact_value)
+            return
+        self._add_to_sketch(value)
+
+    def _add_to_sketch(self, value: str) -> None:
+        hashed = hash(value) & 0xFFFFFFFFFFFFFFFF
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remaining = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    @property
+    def is_exact(self) -> bool:
+        return self._exact_values is not None
+
+    def estimate(self) -> int:
+        if self._exact_values is not None:
+            return len(self._exact_values)
+        m = self.register_count
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw_estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zero_registers = self.registers.count(0)
+        if raw_estimate <= 2.5 * m and zero_registers:
+            # Linear counting is more accurate for small cardinalities
+            return round(m * math.log(m / zero_registers))
+        return round(raw_estimate)
+
+
+def _classify_cell(value) -> tuple[str, object]:
+    """Return (type_name, comparable_value) for a CSV string or openpyxl cell value."""
+    if value is None:
+        return "null", None
+    if isinstance(value, bool):
+        return "boolean", value
+    if isinstance(value, int):
+        return "integer", value
+    if isinstance(value, float):
+        return ("null", None) if math.isnan(value) else ("float", value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return "date", value.isoformat()
+
+    text = str(value).strip()
+    if not text:
+        return "null", None
+    # Cheap character checks avoid raising ValueError for most non-numeric text
+    unsigned = text[1:] if text[0] in "+-" else text
+    # isdigit() also accepts superscript and circled digits, which int() rejects
+    if unsigned.isdecimal():
+        return "integer", int(text)
+    if unsigned[:1].isdigit() or unsigned[:1] == ".":
+        try:
+            return "float", float(text)
+        except ValueError:
+            pass
+    if text.lower() in ("true", "false"):
+        return "boolean", text.lower() == "true"
+    if len(text) >= 8 and text[:4].isdigit():
+        for iso_type in (datetime.date, datetime.datetime):
+            try:
+                return "date", iso_type.fromisoformat(text).isoformat()
+            except ValueError:
+                continue
+    return "string", text
+
+
+class _ColumnProfile:
+    """Running statistics for one column, updated one chunk of values at a time."""
+
+    def __init__(self, name: str, top_value_capacity: int = 64) -> None:
+        self.name = name
+        self.value_count = 0
+        self.null_count = 0
+        self.type_counts: dict[str, int] = {}
+        self.minimums: dict[str, object] = {}
+        self.maximums: dict[str, object] = {}
+        self.distinct = _DistinctCounter()
+        self.top_value_capacity = top_value_capacity
+        # Exact counts per value while the distinct counter is exact; after that a
+        # Space-Saving summary of top_value_capacity counters, each an upper bound on the
+        # true count and at most top_value_errors[key] above it
+        self.top_value_counts: dict[str, int] = {}
+        self.top_value_errors: Optional[dict[str, int]] = None
+
+    def update(self, values) -> None:
+        # Aggregate the chunk first so each distinct value is classified and hashed once
+        value_counts = Counter(values)
+        self.value_count += sum(value_counts.values())
+        key_counts: dict[str, int] = {}
+        for value, count in value_counts.items():
+            type_name, comparable = _classify_cell(value)
+            if type_name == "null":
+                self.null_count += count
+                continue
+            self.type_counts[type_name] = self.type_counts.get(type_name, 0) + count
+
+            # Integers and floats share one numeric range
+            range_key = "numeric" if type_name in ("integer", "float") else type_name
+            if range_key != "boolean":
+                current_min = self.minimums.get(range_key)
+                if current_min is None or comparable < current_min:
+                    self.minimums[range_key] = comparable
+                current_max = self.maximums.get(range_key)
+                if current_max is None or comparable > current_max:
+                    self.maximums[range_key] = comparable
+
+            key = str(value).strip()
+            self.distinct.add(key)
+            key_counts[key] = key_counts.get(key, 0) + count
+        self._add_top_values(key_counts)
+
+    def _add_top_values(self, key_counts: dict[str, int]) -> None:
+        counts = self.top_value_counts
+        if self.top_value_errors is None:
+            for key, count in key_counts.items():
+                counts[key] = counts.get(key, 0) + count
+            if self.distinct.is_exact:
+                return
+            # Too many distinct values to count exactly: keep the largest counts, which are exact
+            self.top_value_errors = dict.fromkeys(counts, 0)
+            key_counts = {}
+
+        errors = self.top_value_errors
+        # Every value outside the full summary occurred at most as often as its smallest counter
+        floor = min(counts.values())
+        for key, count in key_counts.items():
+            if key in counts:
+                counts[key] += count
+            else:
+                counts[key] = floor + count
+                errors[key] = floor
+        if len(counts) > self.top_value_capacity:
+            kept = heapq.nlargest(self.top_value_capacity, counts.items(), key=lambda item: item[1])
+            self.top_value_counts = dict(kept)
+            self.top_value_errors = {key: errors[key] for key, _ in kept}
+
+    def _format_top_count(self, key: str, count: int) -> str:
+        error = 0 if self.top_value_errors is None else self.top_value_errors[key]
+        return f"{count:,}" if error == 0 else f"{count - error:,}-{count:,}"
+
+    def inferred_type(self) -> str:
+        types = set(self.type_counts)
+        if not types:
+            return "empty"
+        if types == {"integer"}:
+            return "integer"
+        if types <= {"integer", "float"}:
+            return "float"
+        if len(types) == 1:
+            return types.pop()
+        return "mixed"
+
+    def summary_lines(self) -> list[str]:
+        inferred_type = self.inferred_type()
+        lines = [f"## Column: {self.name}", f"- type: {inferred_type}"]
+        if inferred_type == "mixed":
+            breakdown = ", ".join(f"{name} {count}" for name, count in sorted(self.type_counts.items()))
+            lines.append(f"- type counts: {breakdown}")
+        lines.append(f"- nulls: {self.null_count} of {self.value_count}")
+
+        range_key = "numeric" if inferred_type in ("integer", "float") else inferred_type
+        if range_key not in self.minimums and "numeric" in self.minimums:
+            range_key = "numeric"
+        if range_key in self.minimums:
+            lines.append(f"- min: {self.minimums[range_key]}")
+            lines.append(f"- max: {self.maximums[range_key]}")
+
+        approx = "" if self.distinct.is_exact else " (approx.)"
+        lines.append(f"- distinct{approx}: {self.distinct.estimate()}")
+
+        # Values seen only once are not informative as "top" values
+        top_values = sorted(
+            ((key, count) for key, count in self.top_value_counts.items() if count > 1),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:5]
+        if top_values:
+            errors = self.top_value_errors
+            rendered = ", ".join(
+                f"{json.dumps(key[:50], ensure_ascii=False)} ({self._format_top_count(key, count)})"
+                for key, count in top_values
+            )
+            label = "top values" if errors is None else "top values (approx., count ranges)"
+            lines.append(f"- {label}: {rendered}")
+        return lines
+
+
+def _iter_tabular_tables(path: str, encoding: str = 'utf-8'):
+    """Yield (sheet_name, row_iterator) for each sheet of a workbook, or (None, rows) for a CSV file."""
+    _, ext = os.path.splitext(path)
+    if ext.lower() == ".csv":
+        if _split_archive_path(path) is not None:
+            with _open_document(path, 'r', encoding=encoding, newline='') as member:
+                yield None, csv.reader(member)
+            return
+        with _open_csv_text(path, encoding) as source:
+            yield None, csv.reader(source)
+        return
+
+    if load_workbook is None:
+        raise RuntimeError(
+            "openpyxl is not installed. To process Excel files, install it with: "
+            "pip install openpyxl"
+        )
+    with _open_document(path) as source:
+        workbook = load_workbook(filename=source, data_only=True, read_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                yield sheet.title, sheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+
+def _is_blank_row(row) -> bool:
+    for cell in row:
+        if cell is not None and (not isinstance(cell, str) or cell.strip()):
+            return False
+    return True
+
+
+class _TableProfiler:
+    """Column profiles of one table, built in chunked, column-oriented passes that can be resumed."""
+
+    def __init__(self) -> None:
+        self.header: Optional[list[str]] = None
+        self.profiles: list[_ColumnProfile] = []
+        self.row_count = 0
+        # Rows of the current, unfinished chunk. Keeping them between feeds means chunks
+        # always split at the same rows, so top-value summaries do not depend on how the
+        # input was divided into feeds.
+        self.pending_rows: list = []
+
+    def feed(self, rows) -> None:
+        chunk = self.pending_rows
+        for row in rows:
+            if _is_blank_row(row):
+                continue
+            if self.header is None:
+                self.header = ["" if cell is None else str(cell).strip() for cell in row]
+                self.profiles = [
+                    _ColumnProfile(name or f"column_{index + 1}") for index, name in enumerate(self.header)
+                ]
+                continue
+            chunk.append(row)
+            self.row_count += 1
+            if len(chunk) >= _PROFILE_CHUNK_ROWS:
+                self._flush_chunk(self.profiles, chunk)
+                chunk.clear()
+
+    @staticmethod
+    def _flush_chunk(profiles: list[_ColumnProfile], chunk: list) -> None:
+        width = max(len(row) for row in chunk)
+        while len(profiles) < width:
+            profiles.append(_ColumnProfile(f"column_{len(profiles) + 1}"))
+        for column_index, column_values in enumerate(itertools.zip_longest(*chunk, fillvalue=None)):
+            profiles[column_index].update(column_values)
+        # Cells missing from short rows are nulls, whatever else is in the chunk
+        for profile in profiles[width:]:
+            profile.update([None] * len(chunk))
+
+    def summary_lines(self, title: str) -> list[str]:
+        profiles = self.profiles
+        if self.pending_rows:
+            # Fold the unfinished chunk into a copy, so more rows can still be fed later
+            profiles = copy.deepcopy(profiles)
+            self._flush_chunk(profiles, self.pending_rows)
+        lines = [f"# Profile: {title}", f"Data rows: {self.row_count:,} (first non-empty row used as header)", ""]
+        for profile in profiles:
+            lines.extend(profile.summary_lines())
+            lines.append("")
+        return lines
+
+
+class _TableSampler:
+    """Reservoir sample of the data rows of one table (Algorithm R) that can be resumed."""
+
+    def __init__(self, sample_size: int, rng: random.Random) -> None:
+        self.sample_size = sample_size
+        self.rng = rng
+        self.header_line: Optional[str] = None
+        self.reservoir: list[tuple[int, str]] = []
+        self.row_count = 0
+
+    def feed(self, rows) -> None:
+        sample_size = self.sample_size
+        reservoir = self.reservoir
+        for row in rows:
+            if _is_blank_row(row):
+                continue
+            line = "\t".join("" if cell is None else str(cell) for cell in row).rstrip()
+            if self.header_line is None:
+                self.header_line = line
+                continue
+            if len(reservoir) < sample_size:
+                reservoir.append((self.row_count, line))
+            else:
+                slot = self.rng.randint(0, self.row_count)
+                if slot < sample_size:
+                    reservoir[slot] = (self.row_count, line)
+            self.row_count += 1
+
+    def summary_lines(self, title: str) -> list[str]:
+        lines = [f"# Sample: {title}"]
+        if self.header_line is not None:
+            lines.append(self.header_line)
+        lines.extend(line for _, line in sorted(self.reservoir))
+        lines.append(
+            f"[INFO: Random sample of {len(self.reservoir)} of {self.row_count:,} data rows, shown in file order. "
+            f"Use sample_size parameter to adjust.]"
+        )
+        lines.append("")
+        return lines
+
+
+def _profile_table(title: str, rows) -> list[str]:
+    """Profile one table in a single chunked, column-oriented pass."""
+    profiler = _TableProfiler()
+    profiler.feed(rows)
+    return profiler.summary_lines(title)
+
+
+def _sample_table(title: str, rows, sample_size: int, rng: random.Random) -> list[str]:
+    """Reservoir-sample sample_size data rows of one table (Algorithm R)."""
+    sampler = _TableSampler(sample_size, rng)
+    sampler.feed(rows)
+    return sampler.summary_lines(title)
+
+
+def _extract_tabular_summary(path: str, mode: str, sample_size: Optional[int] = None) -> str:
+    """Build a profile or reservoir sample of a CSV file or every sheet of a workbook."""
+    effective_sample_size = max(1, sample_size if sample_size is not None else _DEFAULT_SAMPLE_SIZE)
+    _, ext = os.path.splitext(path)
+    # Workbooks carry their own encoding; CSV falls back through the usual encodings
+    encodings = ['utf-8', 'latin-1'] if ext.lower() == ".csv" else ['utf-8']
+
+    for encoding in encodings:
+        try:
+            # Fixed seed so repeated calls on an unchanged file return the same sample
+            rng = random.Random(0)
+            lines: list[str] = []
+            for sheet_name, rows in _iter_tabular_tables(path, encoding):
+                title = os.path.basename(path) if sheet_name is None else f"Sheet: {sheet_name}"
+                if mode == "profile":
+                    lines.extend(_profile_table(title, rows))
+                else:
+                    lines.extend(_sample_table(title, rows, effective_sample_size, rng))
+            return _truncate_output_if_needed("\n".join(lines).strip(), truncated_rows=False, file_path=path)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        except csv.Error as e:
+            raise RuntimeError(f"Failed to read CSV file: {e}") from e
+
+    raise RuntimeError("Failed to decode CSV file with any supported encoding")
+
+
+def _extract_images_from_pdf(pdf_path: str, output_dir: str, images_dirname: str) -> tuple[int, str, dict]:
     """
     Extract images from PDF using PyMuPDF and save them to output directory.
     
@@ -407,11 +1768,852 @@ def _extract_images_from_pdf(pdf_path: str, output_dir: str, images_dirname: str
         return 0, "", {}
 
 
+_EXTRACTABLE_EXTENSIONS = (
+    ".pdf", ".xlsx", ".xlsm", ".xltx", ".xltm", ".csv",
+    ".txt", ".log", ".text", ".json", ".md", ".markdown", ".docx",
+)
+
+
+def _extract_text_by_extension(
+    path: str,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    mode: str = "text",
+    sample_size: Optional[int] = None,
+) -> str:
+    """Route a file to the extractor matching its extension."""
+    _, ext = os.path.splitext(path)
+    ext_lower = ext.lower()
+
+    if mode != "text":
+        return _extract_tabular_summary(path, mode=mode, sample_size=sample_size)
+    if ext_lower == ".pdf":
+        return _extract_text_from_pdf(path, max_pages=max_pages)
+    if ext_lower in (".xlsx", ".xlsm", ".xltx", ".xltm"):
+        return _extract_text_from_xlsx(path, max_rows=max_rows)
+    if ext_lower == ".csv":
+        return _extract_text_from_csv(path, max_rows=max_rows)
+    if ext_lower in (".txt", ".log", ".text"):
+        return _extract_text_from_txt(path)
+    if ext_lower == ".json":
+        return _extract_text_from_json(path)
+    if ext_lower in (".md", ".markdown"):
+        return _extract_text_from_markdown(path)
+    if ext_lower == ".docx":
+        return _extract_text_from_docx(path)
+    raise ValueError(
+        f"Unsupported file type: {ext_lower}. "
+        f"Supported: .pdf, .xlsx, .csv, .txt, .json, .md, .docx"
+    )
+
+
+# CSV and plain text files that grow by appending are re-parsed only from where the
+# previous extraction stopped; that prefix is recognised by its size and the digest of
+# its last block
+_APPEND_CHECK_BLOCK_BYTES = 4096
+_APPENDABLE_TEXT_EXTENSIONS = (".txt", ".log", ".text")
+# latin-1 maps every byte, so the later fallbacks of the one-shot extractors are never reached
+_APPENDABLE_ENCODINGS = ('utf-8', 'latin-1')
+# Any fixed string; its hash shows whether this process hashes strings like the one that built a profile
+_HASH_PROBE = "document-reader-hash-probe"
+
+
+class _CsvRecordReader:
+    """
+    csv.reader over bytes start to end of a file that tracks the byte offset rows end at.
+
+    With complete_only, a last record the data stops in the middle of (no line break
+    yet, or a quoted cell that is not closed yet) is not returned. offset is the byte
+    offset just after the last row returned, so a later read can resume there.
+    """
+
+    def __init__(self, path: str, encoding: str, start: int, end: int, complete_only: bool = True) -> None:
+        self.offset = start
+        self._encoding = encoding
+        self._complete_only = complete_only
+        self._source = _open_csv_text(path, encoding, start, end)
+        self._lines: list[str] = []
+        self._exhausted = False
+
+    def _read_lines(self):
+        for line in self._source:
+            self._lines.append(line)
+            yield line
+        self._exhausted = True
+
+    def __iter__(self):
+        for row in csv.reader(self._read_lines()):
+            # csv.reader only returns a row after running out of lines when the record
+            # was cut off; a row from a last line without a line break is cut off too
+            if self._complete_only and (self._exhausted or not self._lines[-1].endswith(("\n", "\r"))):
+                return
+            self.offset += sum(len(line.encode(self._encoding)) for line in self._lines)
+            self._lines.clear()
+            yield row
+
+    def __enter__(self) -> "_CsvRecordReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._source.close()
+
+
+class _AppendedCsvText:
+    """Text-mode output of a CSV file that rows appended later can be added to."""
+
+    def __init__(self, max_rows: int) -> None:
+        self.builder = TextBuilder()
+        self.max_rows = max_rows
+        self.hit_row_limit = False
+
+    @property
+    def row_count(self) -> int:
+        return self.builder.row_count
+
+    @property
+    def complete(self) -> bool:
+        # Rows past the row or character limit never reach the output
+        return self.hit_row_limit or self.builder.truncated
+
+    resumable = True
+
+    def feed(self, path: str, encoding: str, start: int, end: int, complete_only: bool = True) -> int:
+        with _CsvRecordReader(path, encoding, start, end, complete_only) as rows:
+            self.hit_row_limit = _append_csv_rows(self.builder, rows, self.max_rows)
+        return rows.offset
+
+    def render(self, path: str) -> str:
+        result = self.builder.build(truncated_rows=True, file_path=path)
+        if self.hit_row_limit:
+            result += f"\n\n[INFO: Row limit of {self.max_rows} reached. Use max_rows parameter to adjust.]"
+        return result
+
+
+class _AppendedText:
+    """Output of a plain text file that text appended later can be added to."""
+
+    complete = False
+    resumable = True
+
+    def __init__(self) -> None:
+        self.builder = TextBuilder(separator="")
+        self.row_count = 0
+
+    def feed(self, path: str, encoding: str, start: int, end: int, complete_only: bool = True) -> int:
+        # A half-written last line is kept; _extract_appendable_text does not resume from it
+        for chunk in _iter_text_chunks(path, encoding, _TAIL_READ_BLOCK_BYTES, start, end):
+            self.row_count += chunk.count("\n")
+            self.builder.append(chunk)
+        # Text past the limit is dropped but every chunk is counted, so the size is exact
+        self.builder.exact_size = True
+        return end
+
+    def render(self, path: str) -> str:
+        return self.builder.build(truncated_rows=False, file_path=path)
+
+
+class _AppendedTableSummary:
+    """Profile or reservoir sample of a CSV file that rows appended later can be added to."""
+
+    complete = False
+
+    def __init__(self, mode: str, sample_size: Optional[int]) -> None:
+        if mode == "profile":
+            self.table = _TableProfiler()
+        else:
+            effective_sample_size = max(1, sample_size if sample_size is not None else _DEFAULT_SAMPLE_SIZE)
+            # Same fixed seed as _extract_tabular_summary, so the sample matches a full pass
+            self.table = _TableSampler(effective_sample_size, random.Random(0))
+        self.hash_probe = hash(_HASH_PROBE)
+
+    @property
+    def row_count(self) -> int:
+        return self.table.row_count
+
+    @property
+    def resumable(self) -> bool:
+        # Distinct counts hash values with the per-process string hash (see _DistinctCounter)
+        return not isinstance(self.table, _TableProfiler) or self.hash_probe == hash(_HASH_PROBE)
+
+    def feed(self, path: str, encoding: str, start: int, end: int, complete_only: bool = True) -> int:
+        with _CsvRecordReader(path, encoding, start, end, complete_only) as rows:
+            self.table.feed(rows)
+        return rows.offset
+
+    def render(self, path: str) -> str:
+        lines = self.table.summary_lines(os.path.basename(path))
+        return _truncate_output_if_needed("\n".join(lines).strip(), truncated_rows=False, file_path=path)
+
+
+class _AppendState:
+    """Fingerprint of the processed prefix of a file, with the output built from it."""
+
+    __slots__ = ("size", "last_block_hash", "row_count", "encoding", "payload")
+
+    def __init__(self, size: int, last_block_hash: bytes, row_count: int, encoding: str, payload) -> None:
+        self.size = size
+        self.last_block_hash = last_block_hash
+        self.row_count = row_count
+        self.encoding = encoding
+        self.payload = payload
+
+
+def _read_block_before(f, end: int) -> bytes:
+    start = max(0, end - _APPEND_CHECK_BLOCK_BYTES)
+    f.seek(start)
+    return f.read(end - start)
+
+
+def _hash_block(block: bytes) -> bytes:
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+
+def _is_appendable_document(path: str, mode: str) -> bool:
+    """Return True for local files that _extract_appendable_text can resume."""
+    if _split_archive_path(path) is not None:
+        return False
+    ext_lower = os.path.splitext(path)[1].lower()
+    return ext_lower == ".csv" or (mode == "text" and ext_lower in _APPENDABLE_TEXT_EXTENSIONS)
+
+
+def _extract_appendable_text(
+    path: str,
+    max_rows: Optional[int],
+    mode: str,
+    sample_size: Optional[int],
+    state: Optional[_AppendState],
+) -> tuple[str, Optional[_AppendState]]:
+    """
+    Extract a CSV or plain text file, parsing only what was appended since state was taken.
+
+    state is what the previous call for the same file and parameters returned. It is
+    used only if the file is at least as long as the processed prefix and the last block
+    of that prefix is unchanged; otherwise the file was rewritten and is parsed in full.
+
+    Returns:
+        Tuple of (text, new_state). For CSV files new_state resumes after the last complete
+        record; a record still being written is in the text but parsed again next time.
+        For text files new_state is None when the file does not end with a newline.
+    """
+    is_csv = os.path.splitext(path)[1].lower() == ".csv"
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if state is not None and not (
+            state.size <= size
+            and state.payload.resumable
+            and _hash_block(_read_block_before(f, state.size)) == state.last_block_hash
+        ):
+            logger.info(f"{path} was rewritten rather than appended; parsing it in full")
+            state = None
+        last_block = _read_block_before(f, size)
+
+    try:
+        if state is not None:
+            if state.payload.complete:
+                # Nothing appended after the row or character limit can change the output
+                return state.payload.render(path), state
+            try:
+                checkpoint = state.payload.feed(path, state.encoding, state.size, size)
+                payload, encoding = state.payload, state.encoding
+            except (UnicodeDecodeError, UnicodeError):
+                state = None
+
+        if state is None:
+            for encoding in _APPENDABLE_ENCODINGS:
+                if not is_csv:
+                    payload = _AppendedText()
+                elif mode == "text":
+                    payload = _AppendedCsvText(max_rows if max_rows is not None else _default_max_rows)
+                else:
+                    payload = _AppendedTableSummary(mode, sample_size)
+                try:
+                    checkpoint = payload.feed(path, encoding, 0, size)
+                    break
+                except (UnicodeDecodeError, UnicodeError):
+                    continue
+
+        output = payload
+        if checkpoint < size and not payload.complete:
+            # The last CSV record is cut off: show it like a full parse would, but keep
+            # the state from before it so the next call parses it once it is complete
+            output = copy.deepcopy(payload)
+            output.feed(path, encoding, checkpoint, size, complete_only=False)
+    except csv.Error as e:
+        raise RuntimeError(f"Failed to read CSV file: {e}") from e
+
+    text = output.render(path)
+    if not is_csv and not last_block.endswith(b"\n"):
+        return text, None
+    if checkpoint < size:
+        if encoding != _APPENDABLE_ENCODINGS[0]:
+            # A character cut off at the end also makes UTF-8 fail, so the fallback
+            # encoding may be wrong for the rest of the file
+            return text, None
+        with open(path, 'rb') as f:
+            if _hash_block(_read_block_before(f, size)) != _hash_block(last_block):
+                # Rewritten while it was parsed; the block before checkpoint may be new
+                return text, None
+            last_block = _read_block_before(f, checkpoint)
+    return text, _AppendState(checkpoint, _hash_block(last_block), payload.row_count, encoding, payload)
+
+
+class AppendStateCache:
+    """
+    LRU cache of resumable extraction states for appendable CSV and text files.
+
+    Entries are keyed on the file's resolved path and the extraction parameters but
+    not its size or mtime: the worker checks the stored prefix fingerprint against the
+    file itself. Not shared across processes.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _AppendState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[_AppendState]:
+        with self._lock:
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+            return state
+
+    def put(self, key: tuple, state: _AppendState) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = state
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_append_state_cache_size_env = os.getenv("DOC_READER_APPEND_STATE_CACHE_SIZE", "64")
+try:
+    _append_state_cache_size = max(0, int(_append_state_cache_size_env))
+except ValueError:
+    _append_state_cache_size = 64
+
+_append_state_cache = AppendStateCache(max_entries=_append_state_cache_size)
+
+
+def _append_state_key(path: str, max_rows: Optional[int], mode: str, sample_size: Optional[int]) -> tuple:
+    effective_max_rows = max_rows if max_rows is not None else _default_max_rows
+    return (os.path.realpath(path), effective_max_rows, mode, sample_size, _max_output_chars)
+
+
+class ExtractionResultCache:
+    """In-memory LRU cache of extracted text, bounded by total characters.
+
+    Entries are keyed on the file's resolved path, mtime and size plus the
+    effective page/row limits, so a modified file never serves stale text.
+    Not shared across processes.
+    """
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._total_chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def put(self, key: tuple, text: str) -> None:
+        if self.max_chars <= 0 or len(text) > self.max_chars:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_chars -= len(previous)
+            self._entries[key] = text
+            self._total_chars += len(text)
+            while self._total_chars > self.max_chars and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_chars -= len(evicted)
+
+
+_result_cache_max_chars_env = os.getenv("DOC_READER_RESULT_CACHE_MAX_CHARS", "20000000")
+try:
+    _result_cache_max_chars = max(0, int(_result_cache_max_chars_env))
+except ValueError:
+    _result_cache_max_chars = 20000000
+
+_result_cache = ExtractionResultCache(max_chars=_result_cache_max_chars)
+
+
+def _result_cache_key(
+    path: str,
+    max_pages: Optional[int],
+    max_rows: Optional[int],
+    mode: str = "text",
+    sample_size: Optional[int] = None,
+) -> tuple:
+    document_name, stat_result = _document_identity(path)
+    effective_max_pages = max_pages if max_pages is not None else _default_max_pages
+    effective_max_rows = max_rows if max_rows is not None else _default_max_rows
+    return (
+        document_name,
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+        effective_max_pages,
+        effective_max_rows,
+        mode,
+        sample_size,
+        _max_output_chars,
+    )
+
+
+class _InFlightCall:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls so duplicates await one shared task.
+
+    The shared task is cancelled (killing its worker) only when every caller
+    awaiting it has been cancelled. Keys are dropped as soon as the task finishes,
+    so later calls start fresh; finished results are the result cache's job.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple, _InFlightCall] = {}
+
+    async def run(self, key: tuple, factory):
+        call = self._calls.get(key)
+        if call is None:
+            call = _InFlightCall(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task: self._forget(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: tuple, call: _InFlightCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+_in_flight_calls = SingleFlight()
+
+
+# Calls of one tool that may run at the same time (0 disables the limit)
+_max_in_flight_per_tool_env = os.getenv("DOC_READER_MAX_IN_FLIGHT_PER_TOOL", str(_worker_count))
+try:
+    _max_in_flight_per_tool = max(0, int(_max_in_flight_per_tool_env))
+except ValueError:
+    _max_in_flight_per_tool = _worker_count
+
+# Calls of one tool that may wait for a free slot before new calls are rejected
+_max_queued_per_tool_env = os.getenv("DOC_READER_MAX_QUEUED_PER_TOOL", "16")
+try:
+    _max_queued_per_tool = max(0, int(_max_queued_per_tool_env))
+except ValueError:
+    _max_queued_per_tool = 16
+
+
+class ToolConcurrencyLimiter:
+    """
+    Per-tool cap on running calls with a bounded FIFO wait queue.
+
+    Calls beyond max_in_flight wait for a slot; once max_queued calls are waiting,
+    further calls fail immediately with a retry hint instead of piling up on a
+    saturated server.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self._in_flight: dict[str, int] = {}
+        self._waiters: dict[str, Deque[asyncio.Future]] = {}
+        self._average_seconds: dict[str, float] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, tool_name: str):
+        if self.max_in_flight <= 0:
+            yield
+            return
+        await self._acquire(tool_name)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            previous = self._average_seconds.get(tool_name)
+            self._average_seconds[tool_name] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+            self._release(tool_name)
+
+    async def _acquire(self, tool_name: str) -> None:
+        waiters = self._waiters.setdefault(tool_name, deque())
+        running = self._in_flight.get(tool_name, 0)
+        if running < self.max_in_flight and not waiters:
+            self._in_flight[tool_name] = running + 1
+            return
+        if len(waiters) >= self.max_queued:
+            raise RuntimeError(
+                f"Server busy: {tool_name} has {running} calls running and {len(waiters)} waiting. "
+                f"Retry in about {self._retry_after_seconds(tool_name)} seconds."
+            )
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as this call was cancelled; pass it on
+                self._release(tool_name)
+            elif waiter in waiters:
+                waiters.remove(waiter)
+            raise
+
+    def _release(self, tool_name: str) -> None:
+        # Hand the slot straight to the oldest waiter, keeping the running count
+        waiters = self._waiters.get(tool_name)
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight[tool_name] -= 1
+
+    def _retry_after_seconds(self, tool_name: str) -> int:
+        average = self._average_seconds.get(tool_name, 1.0)
+        queued = len(self._waiters.get(tool_name, ()))
+        return max(1, math.ceil(average * (queued + 1) / self.max_in_flight))
+
+
+_tool_limiter = ToolConcurrencyLimiter(max_in_flight=_max_in_flight_per_tool, max_queued=_max_queued_per_tool)
+
+
+def _limit_concurrency(func):
+    """
+    Run a tool inside its ToolConcurrencyLimiter slot.
+
+    Streaming tools hold the slot until their generator finishes or is closed, so the
+    number of streams buffering output at once is bounded too.
+    """
+    tool_name = func.__name__
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def stream_wrapper(*args, **kwargs):
+            async with _tool_limiter.slot(tool_name):
+                async with contextlib.aclosing(func(*args, **kwargs)) as chunks:
+                    async for chunk in chunks:
+                        yield chunk
+        return stream_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with _tool_limiter.slot(tool_name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+# Profile every call of the profiling-aware tools, not only calls with profile=true
+_profile_all_calls = os.getenv("DOC_READER_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Where .prof files and their text summaries are written
+_profile_dir = os.path.expanduser(
+    os.getenv("DOC_READER_PROFILE_DIR", "")
+    or os.path.join(tempfile.gettempdir(), "document-reader-profiles")
+)
+
+# Number of functions and allocation sites listed in a profile summary
+_profile_top_n_env = os.getenv("DOC_READER_PROFILE_TOP_N", "30")
+try:
+    _profile_top_n = max(1, int(_profile_top_n_env))
+except ValueError:
+    _profile_top_n = 30
+
+
+def _format_allocation_summary(snapshot: "tracemalloc.Snapshot", peak_bytes: int, top_n: int, title: str) -> str:
+    lines = [f"Allocations in {title} (peak traced memory {peak_bytes / (1024 * 1024):.1f} MB):"]
+    # Leave out the profilers' own bookkeeping
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    for stat in snapshot.statistics("lineno")[:top_n]:
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+def _run_profiled(func, args: tuple, kwargs: dict, prof_path: str, top_n: int) -> tuple:
+    """Run a pool job under cProfile and tracemalloc; returns (result, allocation summary)."""
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(prof_path)
+        snapshot = tracemalloc.take_snapshot()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, _format_allocation_summary(snapshot, peak_bytes, top_n, f"worker job {func.__name__}")
+
+
+class ProfileSession:
+    """
+    cProfile and tracemalloc data for one profiled tool call.
+
+    The server-side coroutine is profiled in this process, and every pool job the call
+    starts is profiled inside its worker (see _run_profiled). finish() merges all .prof
+    files into one and writes a top-N text summary next to it.
+    """
+
+    # cProfile and tracemalloc are process-wide, so only one call profiles the server side
+    _server_side_active = False
+
+    def __init__(self, tool_name: str, arguments: dict) -> None:
+        os.makedirs(_profile_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.base_path = os.path.join(_profile_dir, f"{tool_name}-{stamp}")
+        self.prof_path = self.base_path + ".prof"
+        self.summary_path = self.base_path + ".txt"
+        self.tool_name = tool_name
+        self.arguments = arguments
+        self._job_paths: list[str] = []
+        self._allocation_summaries: list[str] = []
+        self._started = time.perf_counter()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if ProfileSession._server_side_active:
+            return
+        ProfileSession._server_side_active = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def next_job_path(self) -> str:
+        path = f"{self.base_path}-job{len(self._job_paths) + 1}.prof"
+        self._job_paths.append(path)
+        return path
+
+    def add_job(self, allocation_summary: str) -> None:
+        self._allocation_summaries.append(allocation_summary)
+
+    def finish(self) -> None:
+        elapsed = time.perf_counter() - self._started
+        prof_paths: list[str] = []
+        if self._profiler is not None:
+            self._profiler.disable()
+            server_prof_path = self.base_path + "-server.prof"
+            self._profiler.dump_stats(server_prof_path)
+            prof_paths.append(server_prof_path)
+            if self._started_tracemalloc:
+                snapshot = tracemalloc.take_snapshot()
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self._allocation_summaries.insert(
+                    0, _format_allocation_summary(snapshot, peak_bytes, _profile_top_n, "server process")
+                )
+            ProfileSession._server_side_active = False
+        prof_paths.extend(path for path in self._job_paths if os.path.isfile(path))
+
+        with open(self.summary_path, "w", encoding="utf-8") as summary:
+            summary.write(f"Profile of {self.tool_name} ({elapsed:.3f} s wall time)\n")
+            for name, value in self.arguments.items():
+                summary.write(f"  {name} = {value!r}\n")
+            summary.write(f"Worker jobs profiled: {len(self._job_paths)}\n")
+            if self._profiler is None:
+                summary.write("Server-side profiling skipped: another profiled call was running.\n")
+            if prof_paths:
+                stats = pstats.Stats(*prof_paths, stream=summary)
+                stats.dump_stats(self.prof_path)
+                summary.write(f"\nTop {_profile_top_n} functions by cumulative time:\n")
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_profile_top_n)
+                summary.write(f"\nTop {_profile_top_n} functions by own time:\n")
+                stats.sort_stats(pstats.SortKey.TIME).print_stats(_profile_top_n)
+            for allocation_summary in self._allocation_summaries:
+                summary.write(f"\n{allocation_summary}\n")
+
+        for path in prof_paths:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    def notice(self) -> str:
+        return f"\n\n[PROFILE: Saved to {self.prof_path}; summary in {self.summary_path}]"
+
+
+# Profile session of the tool call running in the current task, if any
+_active_profile: "contextvars.ContextVar[Optional[ProfileSession]]" = contextvars.ContextVar(
+    "_active_profile", default=None
+)
+
+
+def _profile_tool(func):
+    """
+    Profile a tool call when it is called with profile=True or DOC_READER_PROFILE is set.
+
+    Text results get a [PROFILE: ...] notice appended, dict results get profile_path and
+    profile_summary_path keys, and streams end with a notice chunk.
+    """
+    tool_name = func.__name__
+    signature = inspect.signature(func)
+
+    def start_session(args: tuple, kwargs: dict) -> Optional[ProfileSession]:
+        arguments = signature.bind(*args, **kwargs).arguments
+        if not (_profile_all_calls or arguments.get("profile")):
+            return None
+        session = ProfileSession(tool_name, arguments)
+        session.start()
+        return session
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def stream_wrapper(*args, **kwargs):
+            session = start_session(args, kwargs)
+            if session is None:
+                async with contextlib.aclosing(func(*args, **kwargs)) as chunks:
+                    async for chunk in chunks:
+                        yield chunk
+                return
+            token = _active_profile.set(session)
+            try:
+                async with contextlib.aclosing(func(*args, **kwargs)) as chunks:
+                    async for chunk in chunks:
+                        yield chunk
+            finally:
+                _active_profile.reset(token)
+                session.finish()
+            yield session.notice()
+        return stream_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        session = start_session(args, kwargs)
+        if session is None:
+            return await func(*args, **kwargs)
+        token = _active_profile.set(session)
+        try:
+            result = await func(*args, **kwargs)
+        finally:
+            _active_profile.reset(token)
+            session.finish()
+        if isinstance(result, dict):
+            return {**result, "profile_path": session.prof_path, "profile_summary_path": session.summary_path}
+        return result + session.notice()
+    return wrapper
+
+
+async def _extract_text_isolated(
+    path: str,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    timeout_seconds: float = 0.0,
+    mode: str = "text",
+    sample_size: Optional[int] = None,
+) -> str:
+    """
+    Extract text on a pool worker process, reusing cached results for unchanged files.
+
+    Concurrent calls for the same file and parameters share one extraction. On timeout,
+    returns the pages finished so far (PDF) with a notice, or raises TimeoutError when
+    no partial output is available.
+    """
+    cache_key = _result_cache_key(path, max_pages, max_rows, mode, sample_size)
+    if _active_profile.get() is not None:
+        # A profile should measure the extraction, not a cache hit or someone else's call
+        return await _run_text_extraction(path, cache_key, max_pages, max_rows, timeout_seconds, mode, sample_size)
+
+    cached_text = _result_cache.get(cache_key)
+    if cached_text is not None:
+        return cached_text
+
+    return await _in_flight_calls.run(
+        ("extract",) + cache_key + (timeout_seconds,),
+        lambda: _run_text_extraction(path, cache_key, max_pages, max_rows, timeout_seconds, mode, sample_size),
+    )
+
+
+async def _run_text_extraction(
+    path: str,
+    cache_key: tuple,
+    max_pages: Optional[int],
+    max_rows: Optional[int],
+    timeout_seconds: float,
+    mode: str,
+    sample_size: Optional[int],
+    low_priority: bool = False,
+) -> str:
+    appendable = _is_appendable_document(path, mode)
+    if appendable:
+        state_key = _append_state_key(path, max_rows, mode, sample_size)
+        func, args, kwargs = (
+            _extract_appendable_text,
+            (path, max_rows, mode, sample_size, _append_state_cache.get(state_key)),
+            {},
+        )
+    else:
+        func, args, kwargs = (
+            _extract_text_by_extension,
+            (path,),
+            {"max_pages": max_pages, "max_rows": max_rows, "mode": mode, "sample_size": sample_size},
+        )
+    if low_priority:
+        func, args, kwargs = _run_at_low_priority, (func, args, kwargs), {}
+    text, partial_pieces, timed_out = await _worker_pool.run(func, args, kwargs, timeout_seconds)
+    if timed_out:
+        if not partial_pieces:
+            raise TimeoutError(
+                f"Extraction timed out after {timeout_seconds:g} seconds. "
+                f"Use timeout_seconds parameter or DOC_READER_DEFAULT_TIMEOUT_SECONDS to adjust."
+            )
+        builder = TextBuilder(separator="")
+        for piece in partial_pieces:
+            builder.append(piece)
+        partial_text = builder.build(truncated_rows=True, file_path=path)
+        return partial_text + _timeout_notice(
+            timeout_seconds, f"; returning {len(partial_pieces)} pages completed so far"
+        )
+
+    if appendable:
+        text, append_state = text
+        if append_state is not None:
+            _append_state_cache.put(state_key, append_state)
+
+    if _result_cache_key(path, max_pages, max_rows, mode, sample_size) == cache_key:
+        _result_cache.put(cache_key, text)
+    return text
+
+
 @server.tool
-def extract_text_from_file(
+@_limit_concurrency
+@_profile_tool
+async def extract_text_from_file(
     path: str,
     max_pages: Optional[int] = None,
     max_rows: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+    tail_lines: Optional[int] = None,
+    since_offset: Optional[int] = None,
+    mode: str = "text",
+    sample_size: Optional[int] = None,
+    profile: bool = False,
 ) -> str:
     """
     Extract plain text from local document files.
@@ -426,12 +2628,29 @@ def extract_text_from_file(
     - Markdown (.md, .markdown)
 
     Args:
-        path: Absolute or relative file path on the local machine.
+        path: Absolute or relative file path on the local machine. Files inside a ZIP
+            archive are addressed as "archive.zip!/path/inside.pdf" (see list_archive).
         max_pages: For PDFs, parse only the first N pages. If not specified, defaults to 50 pages.
             Set to 0 to disable page limit (not recommended for large files).
         max_rows: For spreadsheets and CSV, parse only N data rows across all sheets. 
             If not specified, defaults to 500 rows. Set to 0 to disable row limit 
             (not recommended for large files).
+        timeout_seconds: Time budget for this call. If not specified, defaults to 300 seconds
+            (DOC_READER_DEFAULT_TIMEOUT_SECONDS). Set to 0 to disable. Extraction runs in a
+            worker process that is killed on timeout or cancellation; for PDFs the pages finished
+            so far are returned.
+        tail_lines: For plain text files (.txt, .log, .text), return only the last N lines,
+            reading backwards from the end of the file. Works on files of any size.
+        since_offset: For plain text files, return only data appended after this byte offset.
+            Every tail_lines/since_offset response ends with "Next since_offset: N" to use
+            on the following call, so polling a growing log only reads the new data.
+        mode: "text" (default) returns the document text. For CSV and Excel files,
+            "profile" scans every row once and returns per-column type, null count, min/max,
+            distinct-count estimate and top values; "sample" returns a random sample of rows.
+            Both ignore max_rows and run in bounded memory.
+        sample_size: Number of rows returned by mode="sample" (default 100).
+        profile: Run the call under cProfile and tracemalloc and append a [PROFILE: ...]
+            notice with the path of the saved .prof file and its text summary.
 
     Returns:
         Extracted plain text as a string. Output is automatically truncated at 100,000 
@@ -443,46 +2662,46 @@ def extract_text_from_file(
         raise ValueError("path must be a non-empty string")
 
     expanded_path = os.path.expanduser(path)
-    if not os.path.isfile(expanded_path):
+    is_archive_member = _split_archive_path(expanded_path) is not None
+    if not is_archive_member and not os.path.isfile(expanded_path):
         raise FileNotFoundError(f"File not found: {expanded_path}")
 
-    file_size = os.path.getsize(expanded_path)
-    if file_size > 100 * 1024 * 1024:
-        raise ValueError("File too large; limit is 100MB")
-
-    _, ext = os.path.splitext(expanded_path)
-    ext_lower = ext.lower()
-
-    # Route to appropriate extractor based on file extension
-    if ext_lower == ".pdf":
-        text = _extract_text_from_pdf(expanded_path, max_pages=max_pages)
-    elif ext_lower in (".xlsx", ".xlsm", ".xltx", ".xltm"):
-        text = _extract_text_from_xlsx(expanded_path, max_rows=max_rows)
-    elif ext_lower == ".csv":
-        text = _extract_text_from_csv(expanded_path, max_rows=max_rows)
-    elif ext_lower in (".txt", ".log", ".text"):
-        text = _extract_text_from_txt(expanded_path)
-    elif ext_lower == ".json":
-        text = _extract_text_from_json(expanded_path)
-    elif ext_lower in (".md", ".markdown"):
-        text = _extract_text_from_markdown(expanded_path)
-    elif ext_lower == ".docx":
-        text = _extract_text_from_docx(expanded_path)
-    else:
-        raise ValueError(
-            f"Unsupported file type: {ext_lower}. "
-            f"Supported: .pdf, .xlsx, .csv, .txt, .json, .md, .docx"
-        )
-
-    return text
+    # Positional reads only touch the end of the file, so the size cap does not apply
+    if tail_lines is not None or since_offset is not None:
+        if is_archive_member:
+            raise ValueError("tail_lines and since_offset are not supported for files inside archives")
+        return _extract_text_from_log_position(expanded_path, tail_lines=tail_lines, since_offset=since_offset)
+
+    if mode not in _EXTRACTION_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(_EXTRACTION_MODES)}")
+    if mode != "text" and os.path.splitext(expanded_path)[1].lower() not in _TABULAR_EXTENSIONS:
+        raise ValueError('mode="profile" and mode="sample" are only supported for CSV and Excel files')
+
+    # profile and sample read CSV rows as a stream, so the streaming limit applies
+    _enforce_file_size_limit(expanded_path, streaming=mode != "text" and not is_archive_member)
+
+    return await _extract_text_isolated(
+        expanded_path,
+        max_pages=max_pages,
+        max_rows=max_rows,
+        timeout_seconds=_resolve_timeout(timeout_seconds),
+        mode=mode,
+        sample_size=sample_size,
+    )
 
 
 @server.tool
+@_limit_concurrency
+@_profile_tool
 async def extract_text_from_file_stream(
     path: str,
     max_pages: Optional[int] = None,
     max_rows: Optional[int] = None,
     chunk_size: int = 4096,
+    timeout_seconds: Optional[float] = None,
+    tail_lines: Optional[int] = None,
+    since_offset: Optional[int] = None,
+    profile: bool = False,
 ) -> AsyncGenerator[str, None]:
     """
     Stream plain text chunks from local document files.
@@ -490,7 +2709,8 @@ async def extract_text_from_file_stream(
     Supported formats: PDF, Excel, CSV, TXT, JSON, Markdown, DOCX
 
     Args:
-        path: Absolute or relative file path on the local machine.
+        path: Absolute or relative file path on the local machine, or
+            "archive.zip!/path/inside.csv" for a file inside a ZIP archive.
         max_pages: For PDFs, parse only the first N pages. If not specified, defaults to 50 pages.
             Set to 0 to disable page limit (not recommended for large files).
         max_rows: For spreadsheets and CSV, parse only N data rows across all sheets. 
@@ -498,6 +2718,13 @@ async def extract_text_from_file_stream(
             (not recommended for large files).
         chunk_size: Approximate maximum characters per streamed chunk. Actual chunk sizes may
             vary slightly.
+        timeout_seconds: Time budget for this call. If not specified, defaults to 300 seconds
+            (DOC_READER_DEFAULT_TIMEOUT_SECONDS). Set to 0 to disable. When the budget runs out,
+            the chunks sent so far are followed by a timeout notice.
+        tail_lines: For plain text files, stream only the last N lines (see extract_text_from_file).
+        since_offset: For plain text files, stream only data appended after this byte offset.
+        profile: Profile the call (see extract_text_from_file); the last chunk is the
+            [PROFILE: ...] notice.
 
     Yields:
         Text chunks as strings until the entire document (or capped portion) has been sent.
@@ -508,161 +2735,140 @@ async def extract_text_from_file_stream(
         raise ValueError("path must be a non-empty string")
 
     expanded_path = os.path.expanduser(path)
-    if not os.path.isfile(expanded_path):
+    is_archive_member = _split_archive_path(expanded_path) is not None
+    if not is_archive_member and not os.path.isfile(expanded_path):
         raise FileNotFoundError(f"File not found: {expanded_path}")
 
-    file_size = os.path.getsize(expanded_path)
-    if file_size > 100 * 1024 * 1024:
-        raise ValueError("File too large; limit is 100MB")
+    chunk_size = max(512, int(chunk_size))
+
+    # Positional reads only touch the end of the file, so the size cap does not apply
+    if tail_lines is not None or since_offset is not None:
+        if is_archive_member:
+            raise ValueError("tail_lines and since_offset are not supported for files inside archives")
+        text = _extract_text_from_log_position(expanded_path, tail_lines=tail_lines, since_offset=since_offset)
+        for i in range(0, len(text), chunk_size):
+            yield text[i : i + chunk_size]
+            await asyncio.sleep(0)
+        return
+
+    # Archive members are extracted whole on a worker, so the one-shot size limit applies
+    _enforce_file_size_limit(expanded_path, streaming=not is_archive_member)
 
     _, ext = os.path.splitext(expanded_path)
     ext_lower = ext.lower()
-    chunk_size = max(512, int(chunk_size))
+    effective_timeout = _resolve_timeout(timeout_seconds)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + effective_timeout if effective_timeout > 0 else None
+
+    def deadline_passed() -> bool:
+        return deadline is not None and loop.time() >= deadline
+
+    if is_archive_member:
+        # Archive members are read on a worker, then streamed in fixed-size chunks
+        if ext_lower not in _EXTRACTABLE_EXTENSIONS:
+            raise ValueError(
+                f"Unsupported file type: {ext_lower}. "
+                f"Supported: .pdf, .xlsx, .csv, .txt, .json, .md, .docx"
+            )
+        text = await _extract_text_isolated(
+            expanded_path, max_pages=max_pages, max_rows=max_rows, timeout_seconds=effective_timeout
+        )
+        for i in range(0, len(text), chunk_size):
+            yield text[i : i + chunk_size]
+            await asyncio.sleep(0)
 
-    if ext_lower == ".pdf":
+    elif ext_lower == ".pdf":
         # Extract text upfront with page cap, then stream in fixed-size chunks
-        text = _extract_text_from_pdf(expanded_path, max_pages=max_pages)
+        text = await _extract_text_isolated(
+            expanded_path, max_pages=max_pages, timeout_seconds=effective_timeout
+        )
         for i in range(0, len(text), chunk_size):
             yield text[i : i + chunk_size]
             await asyncio.sleep(0)
             
     elif ext_lower in (".xlsx", ".xlsm", ".xltx", ".xltm"):
-        # Stream rows as they are read, accumulating into approx chunk_size blocks
-        if load_workbook is None:
-            raise RuntimeError(
-                "openpyxl is not installed. To process Excel files, install it with: "
-                "pip install openpyxl"
-            )
-        
-        # Apply default row limit if none specified
-        effective_max_rows = max_rows if max_rows is not None else _default_max_rows
-        
-        workbook = load_workbook(filename=expanded_path, data_only=True, read_only=True)
-        try:
-            buffer_lines: list[str] = []
-            buffer_len = 0
-            rows_emitted = 0
-            total_chars_emitted = 0
-            hit_row_limit = False
-            
-            for sheet in workbook.worksheets:
-                header = f"# Sheet: {sheet.title}"
-                if buffer_len + len(header) + 1 > chunk_size and buffer_lines:
-                    chunk_text = "\n".join(buffer_lines)
-                    total_chars_emitted += len(chunk_text)
-                    if total_chars_emitted > _max_output_chars:
-                        break
-                    yield chunk_text
-                    buffer_lines = []
-                    buffer_len = 0
-                    await asyncio.sleep(0)
-                buffer_lines.append(header)
-                buffer_len += len(header) + 1
-
-                for row in sheet.iter_rows(values_only=True):
-                    values = ["" if cell is None else str(cell) for cell in row]
-                    line = "\t".join(values).rstrip()
-                    if not line:
-                        continue
-                    if buffer_len + len(line) + 1 > chunk_size and buffer_lines:
-                        chunk_text = "\n".join(buffer_lines)
-                        total_chars_emitted += len(chunk_text)
-                        if total_chars_emitted > _max_output_chars:
-                            break
-                        yield chunk_text
-                        buffer_lines = []
-                        buffer_len = 0
-                        await asyncio.sleep(0)
-                    buffer_lines.append(line)
-                    buffer_len += len(line) + 1
-                    rows_emitted += 1
-                    if effective_max_rows > 0 and rows_emitted >= effective_max_rows:
-                        hit_row_limit = True
-                        break
-                if hit_row_limit or total_chars_emitted > _max_output_chars:
-                    break
-                    
-            if buffer_lines:
-                chunk_text = "\n".join(buffer_lines)
-                total_chars_emitted += len(chunk_text)
+        # Rows are read into chunks on a worker; on timeout the chunks finished so far are sent
+        final_chunks, partial_chunks, timed_out = await _worker_pool.run(
+            _stream_xlsx_chunks, (expanded_path, max_rows, chunk_size), {}, effective_timeout
+        )
+        for chunk_text in partial_chunks:
+            yield chunk_text
+            await asyncio.sleep(0)
+        if timed_out:
+            yield _timeout_notice(effective_timeout, f" after {len(partial_chunks)} chunks")
+        else:
+            for chunk_text in final_chunks:
                 yield chunk_text
-                
-            # Send info message if limits were hit
-            if hit_row_limit:
-                yield f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]"
-            if total_chars_emitted > _max_output_chars:
-                yield f"\n\n[TRUNCATED: Output exceeded {_max_output_chars:,} character limit.]"
-        finally:
-            workbook.close()
             
     elif ext_lower == ".csv":
         # Stream CSV rows with buffering
         # Apply default row limit if none specified
         effective_max_rows = max_rows if max_rows is not None else _default_max_rows
         
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+        encodings = _TEXT_ENCODINGS
         success = False
         
         for encoding in encodings:
             try:
-                buffer_lines: list[str] = []
-                buffer_len = 0
-                rows_emitted = 0
-                total_chars_emitted = 0
+                builder = TextBuilder()
                 hit_row_limit = False
+                timed_out = False
                 
-                with open(expanded_path, 'r', encoding=encoding, newline='') as f:
-                    reader = csv.reader(f)
+                with _open_csv_text(expanded_path, encoding) as source:
+                    reader = csv.reader(source)
                     for row in reader:
-                        line = "\t".join(str(cell) for cell in row).rstrip()
+                        if deadline_passed():
+                            timed_out = True
+                            break
+                        line = "\t".join(row).rstrip()
                         if not line:
                             continue
-                        if buffer_len + len(line) + 1 > chunk_size and buffer_lines:
-                            chunk_text = "\n".join(buffer_lines)
-                            total_chars_emitted += len(chunk_text)
-                            if total_chars_emitted > _max_output_chars:
-                                break
+                        if not builder.append_row(line):
+                            break
+                        for chunk_text in builder.drain_chunks(chunk_size):
                             yield chunk_text
-                            buffer_lines = []
-                            buffer_len = 0
                             await asyncio.sleep(0)
-                        buffer_lines.append(line)
-                        buffer_len += len(line) + 1
-                        rows_emitted += 1
-                        if effective_max_rows > 0 and rows_emitted >= effective_max_rows:
+                        if effective_max_rows > 0 and builder.row_count >= effective_max_rows:
                             hit_row_limit = True
                             break
                     
-                    if buffer_lines:
-                        chunk_text = "\n".join(buffer_lines)
-                        total_chars_emitted += len(chunk_text)
+                    for chunk_text in builder.drain_chunks(chunk_size, final=True):
                         yield chunk_text
                         
                     # Send info message if limits were hit
                     if hit_row_limit:
                         yield f"\n\n[INFO: Row limit of {effective_max_rows} reached. Use max_rows parameter to adjust.]"
-                    if total_chars_emitted > _max_output_chars:
+                    if builder.truncated:
                         yield f"\n\n[TRUNCATED: Output exceeded {_max_output_chars:,} character limit.]"
+                    if timed_out:
+                        yield _timeout_notice(effective_timeout, f" after {builder.row_count} rows")
                         
                 success = True
                 break
             except (UnicodeDecodeError, UnicodeError):
                 continue
+            except csv.Error as e:
+                raise RuntimeError(f"Failed to read CSV file: {e}") from e
                 
         if not success:
             raise RuntimeError("Failed to decode CSV file with any supported encoding")
             
     elif ext_lower in (".txt", ".log", ".text", ".md", ".markdown"):
         # Stream text files in chunks
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+        encodings = _TEXT_ENCODINGS
         success = False
         
         for encoding in encodings:
             try:
                 total_chars_emitted = 0
-                with open(expanded_path, 'r', encoding=encoding) as f:
+                with contextlib.closing(
+                    _iter_text_chunks(expanded_path, encoding, chunk_size)
+                ) as text_chunks:
                     while True:
-                        chunk = f.read(chunk_size)
+                        if deadline_passed():
+                            yield _timeout_notice(effective_timeout)
+                            break
+                        chunk = next(text_chunks, "")
                         if not chunk:
                             break
                         total_chars_emitted += len(chunk)
@@ -686,14 +2892,14 @@ async def extract_text_from_file_stream(
             
     elif ext_lower == ".json":
         # For JSON, extract all then stream in chunks (can't partially parse JSON)
-        text = _extract_text_from_json(expanded_path)
+        text = await _extract_text_isolated(expanded_path, timeout_seconds=effective_timeout)
         for i in range(0, len(text), chunk_size):
             yield text[i : i + chunk_size]
             await asyncio.sleep(0)
             
     elif ext_lower == ".docx":
         # For DOCX, extract all then stream in chunks
-        text = _extract_text_from_docx(expanded_path)
+        text = await _extract_text_isolated(expanded_path, timeout_seconds=effective_timeout)
         for i in range(0, len(text), chunk_size):
             yield text[i : i + chunk_size]
             await asyncio.sleep(0)
@@ -705,84 +2911,140 @@ async def extract_text_from_file_stream(
         )
 
 
-@server.tool
-def convert_to_markdown(
-    path: str,
-    output_dir: Optional[str] = None,
-    output_filename: Optional[str] = None,
-) -> dict:
+_MARKDOWN_TABLE_WIDTH_SAMPLE_ROWS = 100
+_MARKDOWN_TABLE_MAX_COLUMN_WIDTH = 40
+
+
+def _escape_markdown_cell(value) -> str:
+    if value is None:
+        return ""
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("|", "\\|")
+        .replace("\r\n", "<br>")
+        .replace("\n", "<br>")
+        .replace("\r", "<br>")
+    )
+
+
+def _escape_markdown_row(row) -> list[str]:
+    cells = ["" if cell is None else str(cell) for cell in row]
+    # Most rows need no escaping; one scan of the joined row is cheaper than per-cell replaces
+    joined = "".join(cells)
+    if "|" in joined or "\n" in joined or "\r" in joined or "\\" in joined:
+        return [_escape_markdown_cell(cell) for cell in cells]
+    return cells
+
+
+def _write_markdown_table(output, rows) -> int:
     """
-    Convert various document formats to Markdown, extracting images when applicable.
-    
-    **Important**: This tool converts the ENTIRE document and saves it to a file.
-    It ignores the DOC_READER_DEFAULT_MAX_ROWS, DOC_READER_DEFAULT_MAX_PAGES, and 
-    DOC_READER_MAX_OUTPUT_CHARS environment variables. Only the preview returned to 
-    the AI is limited to protect context - the saved file contains the complete document.
-    
-    Supported formats:
-    - PDF (.pdf) - with image extraction
-    - Excel (.xlsx, .xlsm, .xltx, .xltm) - converted to markdown tables
-    - Word (.docx) - with image extraction
-    - CSV (.csv) - converted to markdown tables
-    - PowerPoint (.pptx) - text and images
-    - HTML (.html, .htm)
-    - Plain text (.txt, .log)
-    - Images (.jpg, .jpeg, .png) - with OCR if available
-    
-    Args:
-        path: Absolute or relative path to the file to convert.
-        output_dir: Directory where the markdown file and images will be saved.
-            If not specified, saves in the same directory as the source file.
-        output_filename: Name for the output markdown file (without extension).
-            If not specified, uses the source filename with .md extension.
-    
-    Returns:
-        Dictionary containing:
-        - markdown_path: Path to the saved markdown file (contains FULL content, not truncated)
-        - images_dir: Path to the directory containing extracted images (if any)
-        - image_count: Number of images extracted
-        - markdown_preview: First 500 characters preview (truncated for AI context protection)
-        - file_size_chars: Total character count of the saved markdown file
+    Write rows as one Markdown table, streaming row by row. Returns characters written.
+
+    The first non-empty row is the header. Column widths are inferred from the first
+    rows only, so the table is padded for readability without holding the data in memory.
     """
-    _enforce_rate_limit()
-    
-    if MarkItDown is None:
-        raise RuntimeError(
-            "markitdown is not installed. To use conversion features, install it with: "
-            "pip install markitdown"
-        )
-    
-    if not path or not isinstance(path, str):
-        raise ValueError("path must be a non-empty string")
-    
-    expanded_path = os.path.expanduser(path)
-    if not os.path.isfile(expanded_path):
-        raise FileNotFoundError(f"File not found: {expanded_path}")
-    
-    file_size = os.path.getsize(expanded_path)
-    if file_size > 100 * 1024 * 1024:
-        raise ValueError("File too large; limit is 100MB")
-    
-    # Determine output directory
-    if output_dir:
-        output_directory = os.path.expanduser(output_dir)
+    sample: list[list[str]] = []
+    row_iterator = iter(rows)
+    for row in row_iterator:
+        if _is_blank_row(row):
+            continue
+        sample.append(_escape_markdown_row(row))
+        if len(sample) > _MARKDOWN_TABLE_WIDTH_SAMPLE_ROWS:
+            break
+    if not sample:
+        return 0
+
+    column_count = max(len(row) for row in sample)
+    widths = [3] * column_count
+    for row in sample:
+        for index, cell in enumerate(row):
+            widths[index] = max(widths[index], min(len(cell), _MARKDOWN_TABLE_MAX_COLUMN_WIDTH))
+
+    def format_row(cells: list[str]) -> str:
+        padded = [
+            cell.ljust(widths[index]) if index < column_count else cell
+            for index, cell in enumerate(cells)
+        ]
+        padded.extend(" " * widths[index] for index in range(len(cells), column_count))
+        return "| " + " | ".join(padded) + " |\n"
+
+    chars_written = 0
+    header, *body = sample
+    for line in (format_row(header), "| " + " | ".join("-" * width for width in widths) + " |\n"):
+        output.write(line)
+        chars_written += len(line)
+    for cells in body:
+        line = format_row(cells)
+        output.write(line)
+        chars_written += len(line)
+    for row in row_iterator:
+        if _is_blank_row(row):
+            continue
+        line = format_row(_escape_markdown_row(row))
+        output.write(line)
+        chars_written += len(line)
+    return chars_written
+
+
+def _convert_tabular_to_markdown_file(expanded_path: str, md_path: str) -> dict:
+    """
+    Convert a CSV file or workbook to Markdown tables without MarkItDown.
+
+    Rows are streamed from csv.reader / openpyxl's read-only iterator straight into
+    the output file, one table per sheet, so memory use does not grow with file size.
+    """
+    source_basename = os.path.basename(expanded_path)
+    _, ext = os.path.splitext(expanded_path)
+    encodings = _TEXT_ENCODINGS if ext.lower() == ".csv" else ['utf-8']
+
+    for encoding in encodings:
+        try:
+            chars_written = 0
+            with open(md_path, 'w', encoding='utf-8') as output:
+                for sheet_name, rows in _iter_tabular_tables(expanded_path, encoding):
+                    if sheet_name is not None:
+                        heading = f"## {sheet_name}\n\n"
+                        output.write(heading)
+                        chars_written += len(heading)
+                    chars_written += _write_markdown_table(output, rows)
+                    if sheet_name is not None:
+                        output.write("\n")
+                        chars_written += 1
+            break
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        except csv.Error as e:
+            raise RuntimeError(f"Failed to read CSV file: {e}") from e
     else:
-        output_directory = os.path.dirname(expanded_path)
-    
-    # Create output directory if it doesn't exist
-    os.makedirs(output_directory, exist_ok=True)
-    
-    # Determine output filename
+        raise RuntimeError("Failed to decode CSV file with any supported encoding")
+
+    with open(md_path, 'r', encoding='utf-8') as f:
+        preview = f.read(500)
+    if chars_written > 500:
+        preview += f"\n\n... (truncated preview, full file has {chars_written:,} characters)"
+
+    return {
+        "markdown_path": md_path,
+        "images_dir": None,
+        "image_count": 0,
+        "markdown_preview": preview,
+        "file_size_chars": chars_written,
+        "status": "success",
+        "message": f"Successfully converted {source_basename} to Markdown ({chars_written:,} characters)"
+    }
+
+
+def _convert_to_markdown_file(expanded_path: str, md_path: str) -> dict:
+    """Convert a document with MarkItDown, save it to md_path and extract images next to it."""
+    _, ext = os.path.splitext(expanded_path)
+    if ext.lower() in _TABULAR_EXTENSIONS:
+        return _convert_tabular_to_markdown_file(expanded_path, md_path)
+
+    output_directory = os.path.dirname(md_path)
     source_basename = os.path.basename(expanded_path)
     source_name, _ = os.path.splitext(source_basename)
     
-    if output_filename:
-        md_filename = output_filename if output_filename.endswith('.md') else f"{output_filename}.md"
-    else:
-        md_filename = f"{source_name}.md"
-    
-    md_path = os.path.join(output_directory, md_filename)
-    
     # Create images directory for this document
     images_dirname = f"{source_name}_images"
     images_dir = os.path.join(output_directory, images_dirname)
@@ -924,5 +3186,540 @@ def convert_to_markdown(
         raise RuntimeError(f"Failed to convert document to Markdown: {e}") from e
 
 
+# Long PDFs are converted in page ranges ("shards") on several pool workers at once
+_pdf_shard_pages_env = os.getenv("DOC_READER_PDF_SHARD_PAGES", "20")
+try:
+    _pdf_shard_pages = max(1, int(_pdf_shard_pages_env))
+except ValueError:
+    _pdf_shard_pages = 20
+
+_pdf_shard_min_pages_env = os.getenv("DOC_READER_PDF_SHARD_MIN_PAGES", "40")
+try:
+    _pdf_shard_min_pages = max(0, int(_pdf_shard_min_pages_env))
+except ValueError:
+    _pdf_shard_min_pages = 40
+
+
+def _count_pdf_pages(path: str) -> int:
+    """Return the number of pages in a PDF without laying any of them out."""
+    if fitz is not None:
+        pdf_document = fitz.open(path)
+        try:
+            return pdf_document.page_count
+        finally:
+            pdf_document.close()
+    with open(path, "rb") as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+
+
+def _extract_pdf_page_range_texts(path: str, first_page: int, end_page: int) -> list[str]:
+    """Return the text of pages [first_page, end_page) without pdfminer's trailing form feeds."""
+    return [
+        page_text.rstrip("\f")
+        for page_text in _iter_pdf_page_texts(path, page_numbers=set(range(first_page, end_page)))
+    ]
+
+
+async def _convert_pdf_to_markdown_sharded(
+    expanded_path: str,
+    md_path: str,
+    page_count: int,
+    timeout_seconds: float,
+) -> tuple[Optional[dict], bool]:
+    """
+    Convert a long PDF to Markdown by laying out page ranges on several pool workers at once.
+
+    Image extraction runs as one more job next to the text shards. The shards are written
+    to md_path in page order, pages separated by form feeds and each page followed by links
+    to its images, the same layout the MarkItDown path produces.
+
+    Returns:
+        Tuple of (result, timed_out) where result has the same keys as _convert_to_markdown_file.
+    """
+    output_directory = os.path.dirname(md_path)
+    source_basename = os.path.basename(expanded_path)
+    source_name, _ = os.path.splitext(source_basename)
+    images_dirname = f"{source_name}_images"
+
+    jobs = [
+        asyncio.ensure_future(_worker_pool.run(
+            _extract_pdf_page_range_texts,
+            (expanded_path, first_page, min(first_page + _pdf_shard_pages, page_count)),
+            {},
+            timeout_seconds,
+        ))
+        for first_page in range(0, page_count, _pdf_shard_pages)
+    ]
+    jobs.append(asyncio.ensure_future(_worker_pool.run(
+        _extract_images_from_pdf,
+        (expanded_path, output_directory, images_dirname),
+        {},
+        timeout_seconds,
+    )))
+    try:
+        results = await asyncio.gather(*jobs)
+    except Exception as e:
+        raise RuntimeError(f"Failed to convert document to Markdown: {e}") from e
+    finally:
+        # One failed or cancelled shard stops the rest (their workers are replaced)
+        for job in jobs:
+            job.cancel()
+
+    *shard_results, (image_result, _, images_timed_out) = results
+    if images_timed_out or any(timed_out for _, _, timed_out in shard_results):
+        return None, True
+    image_count, images_dir, page_to_images = image_result
+
+    chars_written = 0
+    page_num = 0
+    with open(md_path, 'w', encoding='utf-8') as output:
+        for page_texts, _, _ in shard_results:
+            for page_text in page_texts:
+                page_num += 1
+                pieces = [page_text] if page_num == 1 else ['\f', page_text]
+                if page_num in page_to_images:
+                    pieces.append("\n\n")
+                    for img_filename in page_to_images[page_num]:
+                        pieces.append(f"![Image from page {page_num}]({images_dirname}/{img_filename})\n\n")
+                piece = ''.join(pieces)
+                output.write(piece)
+                chars_written += len(piece)
+
+    with open(md_path, 'r', encoding='utf-8') as f:
+        preview = f.read(500)
+    if chars_written > 500:
+        preview += f"\n\n... (truncated preview, full file has {chars_written:,} characters)"
+
+    return {
+        "markdown_path": md_path,
+        "images_dir": images_dir if image_count > 0 else None,
+        "image_count": image_count,
+        "markdown_preview": preview,
+        "file_size_chars": chars_written,
+        "status": "success",
+        "message": f"Successfully converted {source_basename} to Markdown ({chars_written:,} characters)"
+    }, False
+
+
+@server.tool
+@_limit_concurrency
+@_profile_tool
+async def convert_to_markdown(
+    path: str,
+    output_dir: Optional[str] = None,
+    output_filename: Optional[str] = None,
+    timeout_seconds: Optional[float] = None,
+    profile: bool = False,
+) -> dict:
+    """
+    Convert various document formats to Markdown, extracting images when applicable.
+    
+    **Important**: This tool converts the ENTIRE document and saves it to a file.
+    It ignores the DOC_READER_DEFAULT_MAX_ROWS, DOC_READER_DEFAULT_MAX_PAGES, and 
+    DOC_READER_MAX_OUTPUT_CHARS environment variables. Only the preview returned to 
+    the AI is limited to protect context - the saved file contains the complete document.
+    
+    Supported formats:
+    - PDF (.pdf) - with image extraction; long PDFs (DOC_READER_PDF_SHARD_MIN_PAGES) are
+      split into page ranges that are converted on several worker processes in parallel
+    - Excel (.xlsx, .xlsm, .xltx, .xltm) - converted to markdown tables
+    - Word (.docx) - with image extraction
+    - CSV (.csv) - converted to markdown tables
+    - PowerPoint (.pptx) - text and images
+    - HTML (.html, .htm)
+    - Plain text (.txt, .log)
+    - Images (.jpg, .jpeg, .png) - with OCR if available
+    
+    Args:
+        path: Absolute or relative path to the file to convert.
+        output_dir: Directory where the markdown file and images will be saved.
+            If not specified, saves in the same directory as the source file.
+        output_filename: Name for the output markdown file (without extension).
+            If not specified, uses the source filename with .md extension.
+        timeout_seconds: Time budget for this call. If not specified, defaults to 300 seconds
+            (DOC_READER_DEFAULT_TIMEOUT_SECONDS). Set to 0 to disable. The conversion runs in a
+            worker process that is killed on timeout or cancellation.
+        profile: Run the conversion under cProfile and tracemalloc and save a .prof file
+            plus a text summary (see profile_path and profile_summary_path).
+    
+    Returns:
+        Dictionary containing:
+        - markdown_path: Path to the saved markdown file (contains FULL content, not truncated)
+        - images_dir: Path to the directory containing extracted images (if any)
+        - image_count: Number of images extracted
+        - markdown_preview: First 500 characters preview (truncated for AI context protection)
+        - file_size_chars: Total character count of the saved markdown file
+        - profile_path, profile_summary_path: Profile files, when profiling was requested
+    """
+    _enforce_rate_limit()
+    
+    if not path or not isinstance(path, str):
+        raise ValueError("path must be a non-empty string")
+    
+    expanded_path = os.path.expanduser(path)
+    if _split_archive_path(expanded_path) is not None:
+        raise ValueError(
+            "convert_to_markdown does not support files inside archives. "
+            "Use extract_text_from_file, or extract the archive first."
+        )
+    if not os.path.isfile(expanded_path):
+        raise FileNotFoundError(f"File not found: {expanded_path}")
+    
+    _enforce_file_size_limit(expanded_path)
+    
+    # Determine output directory
+    if output_dir:
+        output_directory = os.path.expanduser(output_dir)
+    else:
+        output_directory = os.path.dirname(expanded_path)
+    
+    # Create output directory if it doesn't exist
+    os.makedirs(output_directory, exist_ok=True)
+    
+    # Determine output filename
+    source_basename = os.path.basename(expanded_path)
+    source_name, _ = os.path.splitext(source_basename)
+    
+    if output_filename:
+        md_filename = output_filename if output_filename.endswith('.md') else f"{output_filename}.md"
+    else:
+        md_filename = f"{source_name}.md"
+    
+    md_path = os.path.join(output_directory, md_filename)
+    
+    # Identical concurrent requests share one conversion
+    effective_timeout = _resolve_timeout(timeout_seconds)
+    if _active_profile.get() is not None:
+        return await _run_markdown_conversion(expanded_path, md_path, effective_timeout)
+    document_name, stat_result = _document_identity(expanded_path)
+    flight_key = (
+        "convert",
+        document_name,
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+        os.path.realpath(md_path),
+        effective_timeout,
+    )
+    return await _in_flight_calls.run(
+        flight_key, lambda: _run_markdown_conversion(expanded_path, md_path, effective_timeout)
+    )
+
+
+# Locks for Markdown files and image directories currently being written
+_output_path_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+@contextlib.asynccontextmanager
+async def _lock_output_paths(paths: list[str]):
+    """Hold one lock per output path, acquired in sorted order so callers cannot deadlock."""
+    locks = []
+    for output_path in sorted(set(os.path.realpath(p) for p in paths)):
+        lock = _output_path_locks.get(output_path)
+        if lock is None:
+            lock = asyncio.Lock()
+            _output_path_locks[output_path] = lock
+        locks.append(lock)
+    async with contextlib.AsyncExitStack() as stack:
+        for lock in locks:
+            await stack.enter_async_context(lock)
+        yield
+
+
+async def _run_markdown_conversion(expanded_path: str, md_path: str, effective_timeout: float) -> dict:
+    """Convert on pool workers while holding the locks for md_path and its images directory."""
+    source_name, _ = os.path.splitext(os.path.basename(expanded_path))
+    images_dir = os.path.join(os.path.dirname(md_path), f"{source_name}_images")
+    async with _lock_output_paths([md_path, images_dir]):
+        return await _convert_to_markdown_locked(expanded_path, md_path, effective_timeout)
+
+
+async def _convert_to_markdown_locked(expanded_path: str, md_path: str, effective_timeout: float) -> dict:
+    ext_lower = os.path.splitext(expanded_path)[1].lower()
+
+    # Run the conversion on a pool worker so a runaway converter can be stopped
+    result, timed_out = None, False
+    if ext_lower == ".pdf" and PDFPage is not None and _pdf_shard_min_pages > 0:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        page_count, _, timed_out = await _worker_pool.run(
+            _count_pdf_pages, (expanded_path,), {}, effective_timeout
+        )
+        if not timed_out and page_count >= _pdf_shard_min_pages:
+            remaining = effective_timeout
+            if effective_timeout > 0:
+                remaining = max(0.001, effective_timeout - (loop.time() - started))
+            result, timed_out = await _convert_pdf_to_markdown_sharded(
+                expanded_path, md_path, page_count, remaining
+            )
+    if result is None and not timed_out:
+        # CSV and Excel use the built-in streaming table writer, long PDFs the sharded path
+        if MarkItDown is None and ext_lower not in _TABULAR_EXTENSIONS:
+            raise RuntimeError(
+                "markitdown is not installed. To use conversion features, install it with: "
+                "pip install markitdown"
+            )
+        result, _, timed_out = await _worker_pool.run(
+            _convert_to_markdown_file,
+            (expanded_path, md_path),
+            {},
+            effective_timeout,
+        )
+    if timed_out:
+        raise TimeoutError(
+            f"Markdown conversion timed out after {effective_timeout:g} seconds. "
+            f"Use timeout_seconds parameter or DOC_READER_DEFAULT_TIMEOUT_SECONDS to adjust."
+        )
+    return result
+
+
+@server.tool
+@_limit_concurrency
+async def list_archive(path: str, max_entries: int = 1000, timeout_seconds: Optional[float] = None) -> dict:
+    """
+    List the files inside a ZIP archive without unpacking it.
+
+    Each listed file can be read with extract_text_from_file or extract_text_from_file_stream
+    using its "path" value ("archive.zip!/dir/report.pdf"). The archive's central directory is
+    cached, so listing and then reading several files from the same bundle parses it once.
+
+    Args:
+        path: Absolute or relative path to a .zip file.
+        max_entries: Maximum number of files to list (default 1000). Set to 0 to list all.
+        timeout_seconds: Time budget for this call. If not specified, defaults to 300 seconds
+            (DOC_READER_DEFAULT_TIMEOUT_SECONDS). Set to 0 to disable.
+
+    Returns:
+        Dictionary containing:
+        - archive_path: Path to the archive
+        - file_count: Total number of files in the archive (directories excluded)
+        - files: List of entries with path, name, size, compressed_size, modified
+          (None if the entry has no valid timestamp) and supported (whether
+          extract_text_from_file can read it)
+        - truncated: True if the list was cut at max_entries
+    """
+    _enforce_rate_limit()
+
+    if not path or not isinstance(path, str):
+        raise ValueError("path must be a non-empty string")
+
+    expanded_path = os.path.expanduser(path)
+    if not os.path.isfile(expanded_path):
+        raise FileNotFoundError(f"File not found: {expanded_path}")
+
+    effective_timeout = _resolve_timeout(timeout_seconds)
+    # The central directory of a large archive is parsed on a worker, like any other parse
+    listing, _, timed_out = await _worker_pool.run(
+        _list_archive_entries, (expanded_path, max_entries), {}, effective_timeout
+    )
+    if timed_out:
+        raise TimeoutError(
+            f"Listing the archive timed out after {effective_timeout:g} seconds. "
+            f"Use timeout_seconds parameter or DOC_READER_DEFAULT_TIMEOUT_SECONDS to adjust."
+        )
+    return listing
+
+
+def _zip_entry_modified(info: zipfile.ZipInfo) -> Optional[str]:
+    """ISO timestamp of a ZIP entry, or None for the zero or invalid DOS dates some writers store."""
+    try:
+        return datetime.datetime(*info.date_time).isoformat()
+    except ValueError:
+        return None
+
+
+def _list_archive_entries(expanded_path: str, max_entries: int) -> dict:
+    archive = _archive_cache.open(expanded_path)
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    listed = members if max_entries <= 0 else members[:max_entries]
+
+    files = []
+    for info in listed:
+        files.append({
+            "path": f"{expanded_path}{_ARCHIVE_MEMBER_SEPARATOR}{info.filename}",
+            "name": info.filename,
+            "size": info.file_size,
+            "compressed_size": info.compress_size,
+            "modified": _zip_entry_modified(info),
+            "supported": (
+                os.path.splitext(info.filename)[1].lower() in _EXTRACTABLE_EXTENSIONS
+                and _is_safe_member_name(info.filename)
+            ),
+        })
+
+    return {
+        "archive_path": expanded_path,
+        "file_count": len(members),
+        "files": files,
+        "truncated": len(listed) < len(members),
+    }
+
+
+class PrewarmWatcher:
+    """Background poller that pre-extracts new or changed files into the result cache.
+
+    Files matching the configured globs under the watched directories are
+    extracted with the default page/row limits, so a later
+    ``extract_text_from_file`` call with default arguments is a cache hit.
+    Work is bounded by a worker count and an hourly job budget.
+    """
+
+    def __init__(
+        self,
+        directories: list[str],
+        patterns: list[str],
+        poll_interval_seconds: float = 30.0,
+        order: str = "smallest",
+        max_workers: int = 1,
+        max_jobs_per_hour: int = 120,
+    ) -> None:
+        self.directories = directories
+        self.patterns = patterns
+        self.poll_interval_seconds = poll_interval_seconds
+        self.order = order
+        self.max_workers = max_workers
+        self._hourly_budget = SimpleRateLimiter(max_calls=max_jobs_per_hour, window_seconds=3600)
+        self._seen: dict[str, tuple[int, int]] = {}
+        self._in_flight: set[str] = set()
+        self._in_flight_lock = threading.Lock()
+        self._worker_slots = threading.BoundedSemaphore(max_workers)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._poll_loop, name="doc-reader-prewarm", daemon=True)
+        self._thread.start()
+        logger.info(f"Prewarm watcher started for {len(self.directories)} directories")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._poll_once()
+            except Exception as e:
+                logger.warning(f"Prewarm scan failed: {e}")
+            self._stop_event.wait(self.poll_interval_seconds)
+
+    def _find_changed_files(self) -> list[tuple[str, os.stat_result]]:
+        changed: list[tuple[str, os.stat_result]] = []
+        for directory in self.directories:
+            root = Path(os.path.expanduser(directory))
+            if not root.is_dir():
+                continue
+            for pattern in self.patterns:
+                for candidate in root.glob(pattern):
+                    candidate_path = str(candidate)
+                    ext_lower = os.path.splitext(candidate_path)[1].lower()
+                    if ext_lower not in _EXTRACTABLE_EXTENSIONS:
+                        continue
+                    try:
+                        stat_result = candidate.stat()
+                    except OSError:
+                        continue
+                    limit_mb = _max_file_size_mb_for(ext_lower)
+                    if not candidate.is_file() or (limit_mb > 0 and stat_result.st_size > limit_mb * 1024 * 1024):
+                        continue
+                    signature = (stat_result.st_mtime_ns, stat_result.st_size)
+                    if self._seen.get(candidate_path) == signature:
+                        continue
+                    changed.append((candidate_path, stat_result))
+        return changed
+
+    def _poll_once(self) -> None:
+        changed = self._find_changed_files()
+        if self.order == "newest":
+            changed.sort(key=lambda item: item[1].st_mtime_ns, reverse=True)
+        else:
+            changed.sort(key=lambda item: item[1].st_size)
+
+        for candidate_path, stat_result in changed:
+            if self._stop_event.is_set():
+                return
+            with self._in_flight_lock:
+                if candidate_path in self._in_flight:
+                    continue
+            if not self._hourly_budget.allow():
+                logger.info("Prewarm hourly job budget exhausted; deferring remaining files")
+                return
+            # Blocks until a worker slot is free, which keeps the backlog in priority order
+            self._worker_slots.acquire()
+            with self._in_flight_lock:
+                self._in_flight.add(candidate_path)
+            self._seen[candidate_path] = (stat_result.st_mtime_ns, stat_result.st_size)
+            threading.Thread(
+                target=self._prewarm_file,
+                args=(candidate_path,),
+                name="doc-reader-prewarm-worker",
+                daemon=True,
+            ).start()
+
+    def _prewarm_file(self, path: str) -> None:
+        try:
+            cache_key = _result_cache_key(path, None, None)
+            if _result_cache.get(cache_key) is None:
+                # Parse on a pool worker under its memory limit and the default time budget;
+                # the private event loop never shares single-flight tasks with tool calls
+                asyncio.run(_run_text_extraction(
+                    path, cache_key, None, None, _default_timeout_seconds, "text", None, low_priority=True
+                ))
+            logger.info(f"Prewarmed extraction for {path}")
+        except Exception as e:
+            logger.warning(f"Prewarm extraction failed for {path}: {e}")
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(path)
+            self._worker_slots.release()
+
+
+def _create_prewarm_watcher_from_env() -> Optional[PrewarmWatcher]:
+    """Build a PrewarmWatcher from DOC_READER_WATCH_* variables, or None if not configured."""
+    watch_dirs_env = os.getenv("DOC_READER_WATCH_DIRS", "")
+    directories = [d for d in watch_dirs_env.split(os.pathsep) if d.strip()]
+    if not directories:
+        return None
+
+    globs_env = os.getenv("DOC_READER_WATCH_GLOBS", "**/*")
+    patterns = [g.strip() for g in globs_env.split(",") if g.strip()]
+
+    try:
+        poll_interval_seconds = max(1.0, float(os.getenv("DOC_READER_WATCH_INTERVAL_SECONDS", "30")))
+    except ValueError:
+        poll_interval_seconds = 30.0
+
+    order = os.getenv("DOC_READER_WATCH_ORDER", "smallest").lower()
+    if order not in ("smallest", "newest"):
+        order = "smallest"
+
+    try:
+        max_workers = max(1, int(os.getenv("DOC_READER_WATCH_MAX_WORKERS", "1")))
+    except ValueError:
+        max_workers = 1
+
+    try:
+        max_jobs_per_hour = max(1, int(os.getenv("DOC_READER_WATCH_MAX_JOBS_PER_HOUR", "120")))
+    except ValueError:
+        max_jobs_per_hour = 120
+
+    return PrewarmWatcher(
+        directories=directories,
+        patterns=patterns,
+        poll_interval_seconds=poll_interval_seconds,
+        order=order,
+        max_workers=max_workers,
+        max_jobs_per_hour=max_jobs_per_hour,
+    )
+
+
 if __name__ == "__main__":
-    server.run()
+    # Fork extraction workers before any background threads exist
+    _worker_pool.start()
+    _prewarm_watcher = _create_prewarm_watcher_from_env()
+    if _prewarm_watcher is not None:
+        _prewarm_watcher.start()
+    if _transport == "stdio":
+        server.run()
+    else:
+        server.run(transport=_transport, host=_http_host, port=_http_port)
@@ -0,0 +1,102 @@
+"""Tests for resuming CSV and text extraction from the appended part of a file."""
+
+import pytest
+
+from server import main
+
+
+def _extract(path, mode="text", state=None):
+    return main._extract_appendable_text(str(path), None, mode, None, state)
+
+
+def _append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+@pytest.mark.parametrize("mode", ["text", "profile", "sample"])
+def test_resumed_csv_matches_full_parse(tmp_path, mode):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"id,name\n1,a\n2,b\n")
+    _, state = _extract(path, mode)
+
+    _append(path, b"3,c\r\n4,d\n")
+    text, new_state = _extract(path, mode, state)
+
+    assert text == _extract(path, mode)[0]
+    assert new_state.size == path.stat().st_size
+    assert new_state.row_count > state.row_count
+
+
+@pytest.mark.parametrize("mode", ["text", "profile", "sample"])
+def test_quoted_newline_at_append_boundary(tmp_path, mode):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b'h1,h2\n1,"multi\n')
+    _, state = _extract(path, mode)
+
+    # The newline is inside an open quoted cell, so the record is not complete yet
+    assert state.size == len(b"h1,h2\n")
+
+    _append(path, b'line"\n2,x\n')
+    text, _ = _extract(path, mode, state)
+
+    assert text == _extract(path, mode)[0]
+
+
+def test_quoted_newline_resume_keeps_rows_and_types(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b'h1,h2\n1,"multi\n')
+    _, text_state = _extract(path, "text")
+    _, profile_state = _extract(path, "profile")
+    _append(path, b'line"\n2,x\n')
+
+    text, _ = _extract(path, "text", text_state)
+    profile, _ = _extract(path, "profile", profile_state)
+
+    assert text.startswith("h1\th2\n1\tmulti\nline\n2\tx")
+    assert "Data rows: 2 " in profile
+    assert "## Column: h1\n- type: integer\n" in profile
+
+
+def test_last_csv_line_without_line_break_is_parsed_again(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n3,")
+    text, state = _extract(path)
+
+    assert text.startswith("a\tb\n1\t2\n3")
+    assert state.size == len(b"a,b\n1,2\n")
+
+    _append(path, b"4\n")
+    text, _ = _extract(path, state=state)
+    assert text.startswith("a\tb\n1\t2\n3\t4")
+
+
+def test_rewritten_csv_is_parsed_in_full(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    _, state = _extract(path)
+
+    path.write_bytes(b"a,b\n9,9\n3,4\n")
+    text, _ = _extract(path, state=state)
+
+    assert text.startswith("a\tb\n9\t9\n3\t4")
+
+
+def test_appended_text_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"one\r\ntwo\n")
+    _, state = _extract(path)
+
+    _append(path, b"three\n")
+    text, _ = _extract(path, state=state)
+
+    assert text.startswith("one\ntwo\nthree\n")
+
+
+def test_text_file_without_final_newline_is_not_resumed(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"one\ntw")
+
+    _, state = _extract(path)
+
+    assert state is None
@@ -0,0 +1,82 @@
+"""Tests for reading documents inside ZIP archives."""
+
+import asyncio
+import zipfile
+
+import pytest
+from fastmcp import Client
+
+from server import main
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("docs/notes.txt", "hello from the archive\n")
+        archive.writestr("docs/big.txt", "x" * (2 * 1024 * 1024))
+        archive.writestr("../evil.txt", "outside\n")
+        archive.writestr("docs/../../evil.csv", "a,b\n")
+    return str(path)
+
+
+def _call_tool(name, arguments):
+    async def call():
+        async with Client(main.server) as client:
+            result = await client.call_tool(name, arguments, raise_on_error=False)
+            return result.is_error, result.content[0].text
+
+    return asyncio.run(call())
+
+
+def test_member_is_read_without_unpacking(bundle):
+    with main._open_document(f"{bundle}!/docs/notes.txt", "r", encoding="utf-8") as f:
+        assert f.read() == "hello from the archive\n"
+    assert main._document_size(f"{bundle}!/docs/notes.txt") == len("hello from the archive\n")
+
+
+@pytest.mark.parametrize("member", ["../evil.txt", "docs/../../evil.csv", "docs/..\\..\\evil.txt"])
+def test_dot_dot_members_are_refused(bundle, member):
+    with pytest.raises(ValueError, match="absolute or '..' path"):
+        main._open_document(f"{bundle}!/{member}", "r", encoding="utf-8")
+    with pytest.raises(ValueError, match="absolute or '..' path"):
+        main._document_size(f"{bundle}!/{member}")
+
+
+def test_list_marks_dot_dot_members_unsupported(bundle):
+    listing = main._list_archive_entries(bundle, 0)
+    supported = {entry["name"]: entry["supported"] for entry in listing["files"]}
+
+    assert supported == {
+        "docs/notes.txt": True,
+        "docs/big.txt": True,
+        "../evil.txt": False,
+        "docs/../../evil.csv": False,
+    }
+
+
+def test_missing_member_is_not_found(bundle):
+    with pytest.raises(FileNotFoundError):
+        main._document_size(f"{bundle}!/docs/missing.txt")
+
+
+@pytest.mark.parametrize("tool", ["extract_text_from_file", "extract_text_from_file_stream"])
+def test_oversize_member_is_rejected(bundle, monkeypatch, tool):
+    # The archive itself is small; the limit applies to the uncompressed member
+    monkeypatch.setattr(main, "_max_file_size_mb", 1)
+    monkeypatch.setattr(main, "_max_stream_file_size_mb", 0)
+    monkeypatch.delenv("DOC_READER_MAX_FILE_SIZE_MB_TXT", raising=False)
+
+    is_error, text = _call_tool(tool, {"path": f"{bundle}!/docs/big.txt"})
+
+    assert is_error
+    assert "File too large; limit for .txt files is 1MB" in text
+
+
+def test_oversize_check_uses_uncompressed_size(bundle, monkeypatch):
+    monkeypatch.setattr(main, "_max_file_size_mb", 1)
+    monkeypatch.delenv("DOC_READER_MAX_FILE_SIZE_MB_TXT", raising=False)
+
+    main._enforce_file_size_limit(f"{bundle}!/docs/notes.txt")
+    with pytest.raises(ValueError, match="File too large"):
+        main._enforce_file_size_limit(f"{bundle}!/docs/big.txt")
@@ -0,0 +1,90 @@
+"""Tests for the per-tool in-flight limit and bounded wait queue."""
+
+import asyncio
+
+import pytest
+
+from server import main
+
+
+async def _hold(limiter, tool_name, release, order, label):
+    async with limiter.slot(tool_name):
+        order.append(label)
+        await release.wait()
+
+
+def test_queue_full_call_is_rejected():
+    async def scenario():
+        limiter = main.ToolConcurrencyLimiter(max_in_flight=1, max_queued=1)
+        release = asyncio.Event()
+        order = []
+        running = asyncio.create_task(_hold(limiter, "extract", release, order, "running"))
+        queued = asyncio.create_task(_hold(limiter, "extract", release, order, "queued"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(RuntimeError, match=r"Server busy: extract has 1 calls running and 1 waiting"):
+            async with limiter.slot("extract"):
+                pass
+
+        # Other tools have their own limit
+        async with limiter.slot("convert"):
+            pass
+
+        release.set()
+        await asyncio.gather(running, queued)
+        return order
+
+    assert asyncio.run(scenario()) == ["running", "queued"]
+
+
+def test_waiters_run_in_arrival_order():
+    async def scenario():
+        limiter = main.ToolConcurrencyLimiter(max_in_flight=1, max_queued=10)
+        release = asyncio.Event()
+        order = []
+        tasks = [
+            asyncio.create_task(_hold(limiter, "extract", release, order, index)) for index in range(4)
+        ]
+        await asyncio.sleep(0)
+        assert order == [0]
+        release.set()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3]
+
+
+def test_cancelled_waiter_frees_its_queue_place():
+    async def scenario():
+        limiter = main.ToolConcurrencyLimiter(max_in_flight=1, max_queued=1)
+        release = asyncio.Event()
+        order = []
+        running = asyncio.create_task(_hold(limiter, "extract", release, order, "running"))
+        queued = asyncio.create_task(_hold(limiter, "extract", release, order, "cancelled"))
+        await asyncio.sleep(0)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+
+        # The queue has room again
+        retry = asyncio.create_task(_hold(limiter, "extract", release, order, "retry"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(running, retry)
+        return order
+
+    assert asyncio.run(scenario()) == ["running", "retry"]
+
+
+def test_zero_limit_disables_limiting():
+    async def scenario():
+        limiter = main.ToolConcurrencyLimiter(max_in_flight=0, max_queued=0)
+        release = asyncio.Event()
+        order = []
+        tasks = [asyncio.create_task(_hold(limiter, "extract", release, order, index)) for index in range(3)]
+        await asyncio.sleep(0)
+        running = len(order)
+        release.set()
+        await asyncio.gather(*tasks)
+        return running
+
+    assert asyncio.run(scenario()) == 3
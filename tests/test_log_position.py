@@ -0,0 +1,92 @@
+"""Tests for reading the end of growing log files (tail_lines / since_offset)."""
+
+from server import main
+
+
+def test_tail_returns_last_lines_and_next_offset(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"one\ntwo\nthree\nfour\n")
+
+    result = main._read_text_tail(str(path), 2)
+
+    assert result.startswith("three\nfour\n\n[INFO: Showing last 2 lines.")
+    assert result.endswith(f"Next since_offset: {path.stat().st_size}]")
+
+
+def test_tail_strips_crlf(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+
+    result = main._read_text_tail(str(path), 2)
+
+    assert result.startswith("two\nthree\n\n[INFO:")
+    assert "\r" not in result
+
+
+def test_since_offset_reads_only_appended_lines(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"old\n")
+    offset = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b"new 1\nnew 2\n")
+
+    result = main._read_text_since(str(path), offset)
+
+    assert result.startswith("new 1\nnew 2\n\n\n[INFO: Read bytes 4-16 of 16.")
+    assert result.endswith("Next since_offset: 16]")
+
+
+def test_since_offset_leaves_partial_last_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"done\nhalf a li")
+
+    result = main._read_text_since(str(path), 0)
+
+    assert result.startswith("done\n\n\n[INFO:")
+    assert result.endswith("Next since_offset: 5]")
+
+    with open(path, "ab") as f:
+        f.write(b"ne\n")
+    assert main._read_text_since(str(path), 5).startswith("half a line\n\n\n[INFO:")
+
+
+def test_since_offset_with_only_a_partial_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"still writing")
+
+    result = main._read_text_since(str(path), 0)
+
+    assert "still being written" in result
+    assert result.endswith("Next since_offset: 0]")
+
+
+def test_since_offset_does_not_split_crlf(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"a\r\nb\r")
+
+    result = main._read_text_since(str(path), 0)
+
+    assert result.startswith("a\n\n\n[INFO:")
+    assert result.endswith("Next since_offset: 3]")
+
+
+def test_since_offset_after_truncation_restarts(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"line 1\nline 2\nline 3\n")
+    offset = path.stat().st_size
+    path.write_bytes(b"rotated\n")
+
+    result = main._read_text_since(str(path), offset)
+
+    assert result.startswith("[INFO: File is smaller than since_offset")
+    assert "rotated\n" in result
+    assert result.endswith("Next since_offset: 8]")
+
+
+def test_decode_text_bytes_uses_extractor_encodings(tmp_path):
+    # 0x80 is not UTF-8; the extractors fall back to latin-1 before cp1252
+    path = tmp_path / "latin.txt"
+    path.write_bytes(b"caf\xe9 \x80\r\n")
+
+    assert main._decode_text_bytes(b"caf\xe9 \x80\r\n") == "caf\xe9 \x80\n"
+    assert main._extract_text_from_txt(str(path)).rstrip("\n") == "caf\xe9 \x80"
@@ -0,0 +1,57 @@
+"""Tests for TextBuilder truncation and chunking boundaries."""
+
+import pytest
+
+from server import main
+
+
+@pytest.mark.parametrize("separator", ["\n", "\n\n", ""])
+def test_text_until_matches_slicing_the_joined_text(separator):
+    pieces = ["alpha", "", "bc", "d", "efghij"]
+    builder = main.TextBuilder(separator=separator, max_chars=0)
+    for piece in pieces:
+        builder.append(piece)
+    full = separator.join(pieces)
+
+    for end in range(len(full) + 1):
+        assert builder._text_until(end) == full[:end]
+
+
+def test_cut_on_next_piece_start_keeps_separator():
+    builder = main.TextBuilder(max_chars=0)
+    builder.append("abc")
+    builder.append("def")
+
+    # Offset 4 is where "def" starts, right after the "\n"
+    assert builder._text_until(4) == "abc\n"
+
+
+def test_build_truncates_at_line_boundary_with_notice():
+    builder = main.TextBuilder(max_chars=20)
+    for index in range(10):
+        builder.append_row(f"row {index}")
+
+    text = builder.build()
+
+    assert text.startswith("row 0\nrow 1\nrow 2\n\n[TRUNCATED: Output exceeded 20 character limit.")
+    assert "Output ends after row 3. " in text
+    assert not builder.exact_size
+
+
+def test_build_exactly_at_limit_is_not_truncated():
+    builder = main.TextBuilder(max_chars=11)
+    builder.append("hello")
+    builder.append("world")
+
+    assert not builder.truncated
+    assert builder.build() == "hello\nworld"
+
+
+def test_drain_chunks_stops_at_limit_on_row_boundary():
+    builder = main.TextBuilder(max_chars=20)
+    for index in range(10):
+        builder.append_row(f"row {index}")
+
+    chunks = list(builder.drain_chunks(8, final=True))
+
+    assert "\n".join(chunks) == "row 0\nrow 1\nrow 2"
@@ -0,0 +1,37 @@
+"""Tests for the buffered text chunk reader used by streaming and appended text."""
+
+from server import main
+
+
+def test_chunks_match_full_decode_across_boundaries(tmp_path):
+    path = tmp_path / "notes.txt"
+    data = "café\r\nnaïve\rline\n".encode("utf-8") * 50
+    path.write_bytes(data)
+
+    # A 3-byte chunk splits multi-byte characters and CRLF pairs
+    text = "".join(main._iter_text_chunks(str(path), "utf-8", 3))
+
+    assert text == "café\nnaïve\nline\n" * 50
+
+
+def test_chunks_respect_start_and_end(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"first\nsecond\nthird\n")
+
+    text = "".join(main._iter_text_chunks(str(path), "utf-8", 4, start=6, end=13))
+
+    assert text == "second\n"
+
+
+def test_file_truncated_while_reading_ends_text(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"x" * 1_000_000)
+
+    chunks = main._iter_text_chunks(str(path), "utf-8", 1000)
+    first = next(chunks)
+    path.write_bytes(b"")
+    rest = "".join(chunks)
+
+    assert first == "x" * 1000
+    # Whatever was already buffered is returned, then the text just ends
+    assert len(first) + len(rest) < 1_000_000
@@ -0,0 +1,86 @@
+"""Tests for the extraction worker pool: results, errors, and timeouts that kill the worker."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from server import main
+
+
+# Jobs are sent to worker processes, so they must be importable module-level functions
+
+def _add(a, b):
+    return a + b
+
+
+def _fail():
+    raise ValueError("bad document")
+
+
+def _pages_then_hang(pages):
+    main._report_partial_result(str(os.getpid()))
+    for page in range(1, pages + 1):
+        main._report_partial_result(f"page {page}")
+    time.sleep(60)
+
+
+@pytest.fixture
+def pool():
+    pool = main.ExtractionWorkerPool(size=1, max_jobs_per_worker=100, memory_limit_mb=0, max_rss_mb=0)
+    yield pool
+    for worker in pool._idle_workers:
+        worker.close()
+
+
+def _wait_for_idle_worker(pool, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not pool._idle_workers:
+        assert time.monotonic() < deadline, "no replacement worker was started"
+        time.sleep(0.02)
+    return pool._idle_workers[0]
+
+
+def test_run_returns_result_and_reuses_worker(pool):
+    async def scenario():
+        first = await pool.run(_add, (1, 2), {}, 30)
+        second = await pool.run(_add, (3, 4), {}, 30)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == (3, [], False)
+    assert second == (7, [], False)
+    assert pool._idle_workers[0].jobs_completed == 2
+
+
+def test_job_error_is_raised_in_caller(pool):
+    with pytest.raises(ValueError, match="bad document"):
+        asyncio.run(pool.run(_fail, (), {}, 30))
+
+
+def test_timeout_kills_worker_and_returns_partial_pages(pool):
+    async def scenario():
+        # The first job imports this module in the worker, which must not eat the budget
+        await pool.run(_add, (0, 0), {}, 30)
+        return await pool.run(_pages_then_hang, (3,), {}, 1.0)
+
+    started = time.monotonic()
+    result, pieces, timed_out = asyncio.run(scenario())
+
+    assert time.monotonic() - started < 10
+    assert timed_out
+    assert result is None
+    assert pieces[1:] == ["page 1", "page 2", "page 3"]
+
+    replacement = _wait_for_idle_worker(pool)
+    worker_pid = int(pieces[0])
+    assert replacement.process.pid != worker_pid
+    if os.name == "posix":
+        # Signal 0 only checks that the process exists (on Windows os.kill would terminate it)
+        with pytest.raises(ProcessLookupError):
+            os.kill(worker_pid, 0)
+
+    # The pool keeps working after the kill
+    assert asyncio.run(pool.run(_add, (1, 1), {}, 30)) == (2, [], False)